@@ -1,48 +1,154 @@
-from flask import Flask, render_template, request, jsonify, send_file
-import subprocess
+from flask import Flask, Response, render_template, request, jsonify, send_file
+import atexit
 import os
 import json
+import queue
 import threading
 from datetime import datetime
-import csv
 import uuid
 import time
-import re
-import signal
+from contextlib import contextmanager
+
+import batch
+import fanout
+import linkedin_scraper
+import rubyonremote_scraper
+from checkpoint import Checkpoint, list_checkpoints
+from driver_pool import DriverPool, allocate_port, browser_process_count
+from downloads import output_format, serve_output
+from driver_trace import TRACE_DIR, DriverTrace
+from events import EventBroker
+from job_store import JobStore
+from metrics import CONTENT_TYPE, Registry
+from page_cache import PageCache
+from profile_manager import profiles
+from scheduler import JobScheduler, QueueFull, lane_for
+from progress import ProgressReporter
+from readiness import WaitStats
+from resource_blocking import BlockStats
+from record_sink import RecordSink
+from retention import RetentionManager
+from scrape_config import ScrapeConfig
+from seen_index import SeenIndex
 
 app = Flask(__name__)
 
 # --- Configuration ---
 OUTPUT_DIR = 'scraper_outputs'
-os.makedirs(OUTPUT_DIR, exist_ok=True)
+OUTPUT_COMPRESSION = 'gzip'  # Outputs are stored compressed (None: plain files)
+
+DRIVER_POOL_SIZE = 2       # Warm headless browsers kept ready for jobs
+DRIVER_LEASE_TIMEOUT = 60  # Seconds a job waits for a pooled browser before launching its own
+EXTRA_DRIVER_LEASE_TIMEOUT = 5  # Parallel detail workers launch their own browser if none is free by then
+
+JOB_TIMEOUT = 900          # Seconds a job (or batch query) may run; its browsers are quit at the deadline
+
+SCRAPER_WORKERS = 4        # Jobs run concurrently in this process; more wait in the scheduler queue
+BATCH_BROWSERS = 2         # Browsers (and query threads) shared by the queries of one batch
+
+SCRAPERS = {
+    'linkedin': linkedin_scraper,
+    'rubyonremote': rubyonremote_scraper,
+    'all': fanout,  # Every platform at once, merged into one deduplicated output
+}
+
+driver_pool = DriverPool(size=DRIVER_POOL_SIZE, headless=True)
+
+JOBS_PAGE_SIZE = 50        # Default and maximum page size for /api/jobs
+JOBS_PAGE_MAX = 500
+LONG_POLL_MAX = 30         # Upper bound for ?wait= on the status endpoints
+
+# Job status lives in SQLite; only running and recently used jobs are kept in memory.
+# Opened by open_stores() on startup, so importing this module creates no files
+job_store = None
+event_broker = EventBroker()
+seen_index = None  # Postings scraped by earlier jobs, shared by every scraper (see open_stores)
+page_cache = None  # Fetched HTML shared between concurrent and back-to-back jobs (see open_stores)
+
+def show_queue_positions(positions):
+    # Reported after the scheduler lock is released: a worker may have started the job meanwhile
+    for job_id, (position, queued) in positions.items():
+        def show(job, position=position, queued=queued):
+            if job.get('status') != 'queued': return
+            job.update(queue_position=position, progress=f"Queued ({position} of {queued})...")
+        modify_job(job_id, show)
 
-# Store scraping job status
-scraping_jobs = {}
-job_counter = 0
-job_lock = threading.Lock()
+scheduler = JobScheduler(SCRAPER_WORKERS, on_queue_change=show_queue_positions)
+
+def forget_outputs(job_id, paths):
+    # Called after retention deleted files: the job must no longer offer them for download
+    if job_store.get(job_id) is None: return
+    def drop(job):
+        remaining = [p for p in job.get('output_files') or [job.get('output_file')] if p and p not in paths]
+        job.update(output_files=remaining, output_file=remaining[0] if remaining else None)
+        if not remaining: job['output_expired'] = True
+        if any(p.endswith('.part') for p in paths): job['resumable'] = False
+    modify_job(job_id, drop)
+
+# Output files are indexed with their size and last use; old and least recently used ones are deleted
+retention = None  # See open_stores
+
+# --- Metrics ---
+# Served at /metrics; scrape timings come from the scrapers' phase events (see handle_progress)
+metrics = Registry()
+PHASE_SECONDS = metrics.histogram('scraper_phase_seconds', 'Duration of scrape phases.', ('platform', 'phase'))
+JOB_SECONDS = metrics.histogram('scraper_job_seconds', 'Run time of finished jobs.', ('platform', 'status'))
+JOBS_TOTAL = metrics.counter('scraper_jobs_total', 'Finished jobs by outcome.', ('platform', 'status'))
+PAGES_TOTAL = metrics.counter('scraper_pages_total', 'Result pages visited.', ('platform',))
+RECORDS_TOTAL = metrics.counter('scraper_records_total', 'Records emitted, scraped or reused from the seen index.', ('platform', 'source'))
+ERRORS_TOTAL = metrics.counter('scraper_errors_total', 'Errors reported while scraping.', ('platform',))
+SKIPPED_TOTAL = metrics.counter('scraper_skipped_total', 'Postings skipped while scraping.', ('platform',))
+metrics.gauge('scraper_jobs_running', 'Jobs currently running.', callback=lambda: scheduler.stats()['running'])
+metrics.gauge('scraper_jobs_queued', 'Jobs waiting in the scheduler.', ('lane',),
+              callback=lambda: {(lane,): n for lane, n in scheduler.stats()['queued'].items()})
+metrics.gauge('scraper_pool_browsers', 'Pooled browsers by state.', ('state',),
+              callback=lambda: {(state,): driver_pool.stats()[state] for state in ('idle', 'leased', 'starting')})
+metrics.gauge('scraper_browser_processes', 'Live browser processes started by this server.', callback=browser_process_count)
 
 # --- Helpers ---
-def slugify(text):
-    if not text: return ""
-    return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+def modify_job(job_id, change):
+    # Single write path for job state: every change is pushed to /api/events subscribers
+    snapshot = job_store.modify(job_id, change)
+    event_broker.publish('job', snapshot.json)
 
-def cleanup_old_files():
-    try:
-        cutoff_time = time.time() - (3 * 24 * 60 * 60)
-        for filename in os.listdir(OUTPUT_DIR):
-            filepath = os.path.join(OUTPUT_DIR, filename)
-            if os.path.isfile(filepath) and os.path.getmtime(filepath) < cutoff_time:
-                try: os.remove(filepath)
-                except: pass
-    except: pass
-
-def start_cleanup_thread():
-    def cleanup_loop():
-        while True:
-            cleanup_old_files()
-            time.sleep(3600)
-    thread = threading.Thread(target=cleanup_loop, daemon=True)
-    thread.start()
+def update_job(job_id, **fields):
+    modify_job(job_id, lambda job: job.update(fields))
+
+def snapshot_response(snapshot):
+    # Snapshots are serialized once; clients revalidate with If-None-Match and get a 304 if unchanged
+    response = app.response_class(snapshot.json, mimetype='application/json')
+    response.set_etag(f"v{snapshot.version}")
+    response.headers['Cache-Control'] = 'no-cache'
+    return response.make_conditional(request)
+
+def wait_for_change(get_version):
+    # Long-poll: with ?since=<version>&wait=<seconds>, hold the request until something newer exists
+    since = request.args.get('since', type=int)
+    wait = min(request.args.get('wait', 0, type=float), LONG_POLL_MAX)
+    if since is not None and wait > 0:
+        job_store.wait(lambda: get_version() > since, wait)
+
+def restore_interrupted_jobs():
+    # Jobs still marked running were cut off by a restart; those with a checkpoint can be resumed
+    checkpoints = dict(list_checkpoints())
+    for job in job_store.by_status('queued'):
+        update_job(job.job_id, status='error', error='Server restarted before the job started.')
+    for job in job_store.by_status('running'):
+        if job.job_id in checkpoints:
+            update_job(job.job_id, status='interrupted', resumable=True,
+                       progress='Interrupted. Resume to continue from the last checkpoint.')
+        else:
+            update_job(job.job_id, status='error', error='Server restarted while the job was running.')
+    # Checkpoints of jobs the store has never seen (e.g. written before it existed)
+    for job_id, checkpoint in checkpoints.items():
+        if job_store.get(job_id) is None:
+            job = dict(checkpoint.state.get('job', {}))
+            job.update({
+                'status': 'interrupted',
+                'progress': 'Interrupted. Resume to continue from the last checkpoint.',
+                'resumable': True,
+            })
+            job_store.create(job, job_id=job_id)
 
 # --- Routes ---
 @app.route('/')
@@ -51,183 +157,525 @@ def index():
 
 @app.route('/api/scrape', methods=['POST'])
 def start_scrape():
-    global job_counter
     data = request.json
-    
-    with job_lock:
-        job_counter += 1
-        job_id = job_counter
-    
-    file_id = str(uuid.uuid4())[:8]
-    timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
-    
+    if scheduler.queued_count() >= scheduler.max_queued:
+        return jsonify({'error': 'Too many jobs waiting, try again later'}), 429
+    job = new_job(data, lane=lane_for(int(data.get('max_pages') or 1)))
+    return submit_job(job, run_scraper, data)
+
+def new_job(data, **fields):
     # Initialize Job State
-    scraping_jobs[job_id] = {
-        'status': 'running',
-        'progress': 'Initializing...',
+    job = {
+        'status': 'queued',
+        'progress': 'Queued...',
         'platform': data.get('platform', 'linkedin'),
+        'engine': data.get('engine', 'browser'),
         'job_keywords': data.get('job_keywords', ''),
         'job_location': data.get('job_location', ''),
-        'file_id': file_id,
-        'timestamp': timestamp,
+        'incremental': bool(data.get('incremental', False)),
+        'file_id': str(uuid.uuid4())[:8],
+        'timestamp': datetime.now().strftime('%Y%m%d_%H%M%S'),
         'started_at': datetime.now().isoformat(), # Fixed date issue
+        'queued_at': time.time(),
         'jobs_found': 0,
         'jobs_processed': 0,
         'results_count': 0
     }
-    
-    thread = threading.Thread(
-        target=run_scraper,
-        args=(job_id, data)
-    )
-    thread.daemon = True
-    thread.start()
-    
-    return jsonify({'job_id': job_id, 'status': 'started'})
+    job.update(fields)
+    return job
+
+def submit_job(job, run, *args):
+    job_id = job_store.create(job).job_id
+    update_job(job_id)
+    try:
+        position = scheduler.submit(job_id, job['lane'], run, job_id, *args)
+    except QueueFull as e:
+        update_job(job_id, status='error', error=str(e))
+        return jsonify({'job_id': job_id, 'error': str(e)}), 429
+    return jsonify({'job_id': job_id, 'status': 'queued', 'queue_position': position})
+
+@app.route('/api/batch', methods=['POST'])
+def start_batch():
+    # Many keyword x location queries as one job: shared browsers, each posting fetched once
+    data = request.json or {}
+    try:
+        queries = batch.plan(data)
+    except ValueError as e:
+        return jsonify({'error': str(e)}), 400
+    unknown = sorted({q['platform'] for q in queries if q['platform'] not in SCRAPERS})
+    if unknown: return jsonify({'error': f"Unknown platform: {', '.join(unknown)}"}), 400
+    if scheduler.queued_count() >= scheduler.max_queued:
+        return jsonify({'error': 'Too many jobs waiting, try again later'}), 429
+    job = new_job(data, lane='bulk', platform='batch', job_keywords=f"{len(queries)} queries", job_location='',
+                  queries=[{'query': batch.describe(q), 'status': 'queued', 'jobs_found': 0, 'records': 0}
+                           for q in queries])
+    return submit_job(job, run_batch, data, queries)
+
+def handle_log(job_id, line):
+    print(f"[JOB {job_id}] {line}") # Server log
+
+def handle_progress(job_id, event, platform=''):
+    # Structured events from the scraper (see progress.py); no log parsing involved
+    kind = event['type']
+    observe_progress(platform, event)
+    if event.get('platform'):
+        track_platform(job_id, event)
+        if kind in ('page', 'found', 'duplicate', 'platform_done'): return
+    if kind == 'page':
+        update_job(job_id, current_page=event['page'], progress=f"Scraping page {event['page']}...")
+    elif kind == 'list_loaded':
+        update_job(job_id, progress=f"Loaded {event['count']} jobs...")
+    elif kind == 'found':
+        update_job(job_id, jobs_found=event['total'])
+    elif kind == 'record':
+        if event.get('reused'):
+            modify_job(job_id, lambda job: job.update(jobs_reused=job.get('jobs_reused', 0) + 1,
+                                                     progress=f"Reused: {event['title'][:30]}..."))
+        else:
+            update_job(job_id, progress=f"Saved: {event['title'][:30]}...")
+    elif kind in ('skipped', 'error'):
+        counter = 'jobs_skipped' if kind == 'skipped' else 'errors'
+        modify_job(job_id, lambda job: job.update({counter: job.get(counter, 0) + 1}))
+    elif kind == 'phase_start':
+        update_job(job_id, phase=event['phase'])
+    elif kind == 'phase_end':
+        def add_timing(job):
+            phases = job.setdefault('phases', {})
+            timing = phases.setdefault(event['phase'], {'count': 0, 'total': 0.0})
+            timing['count'] += 1
+            timing['total'] = round(timing['total'] + event['duration'], 3)
+        modify_job(job_id, add_timing)
+
+def track_platform(job_id, event):
+    # Multi-platform jobs: per-platform progress under 'platforms', overall counts summed over them
+    kind = event['type']
+    def track(job):
+        platforms = job.setdefault('platforms', {})
+        p = platforms.setdefault(event['platform'], {'status': 'running', 'jobs_found': 0, 'records': 0})
+        if kind == 'page':
+            p['current_page'] = event['page']
+        elif kind == 'found':
+            p['jobs_found'] = event['total']
+            job['jobs_found'] = sum(s['jobs_found'] for s in platforms.values())
+        elif kind == 'record':
+            p['records'] += 1
+        elif kind == 'duplicate':
+            p['duplicates'] = p.get('duplicates', 0) + 1
+            job['duplicates'] = job.get('duplicates', 0) + 1
+        elif kind == 'error':
+            p['errors'] = p.get('errors', 0) + 1
+        elif kind == 'phase_start':
+            p['phase'] = event['phase']
+        elif kind == 'platform_done':
+            p['status'] = event['status']
+            if event.get('error'): p['error'] = event['error']
+    modify_job(job_id, track)
+
+def observe_progress(platform, event):
+    kind = event['type']
+    platform = event.get('platform', platform)
+    if kind == 'phase_end':
+        PHASE_SECONDS.observe(event['duration'], platform=platform, phase=event['phase'])
+    elif kind == 'page':
+        PAGES_TOTAL.inc(platform=platform)
+    elif kind == 'record':
+        RECORDS_TOTAL.inc(platform=platform, source='reused' if event.get('reused') else 'scraped')
+    elif kind == 'error':
+        ERRORS_TOTAL.inc(platform=platform)
+    elif kind == 'skipped':
+        SKIPPED_TOTAL.inc(platform=platform)
+
+def output_formats(data):
+    fmt = data.get('output_format') or 'csv'
+    return ('csv', 'ndjson') if fmt == 'both' else (fmt,)
+
+@contextmanager
+def lease_extra_driver():
+    with driver_pool.lease(timeout=EXTRA_DRIVER_LEASE_TIMEOUT) as pooled:
+        yield pooled.driver if pooled else None
+
+@contextmanager
+def watchdog(config):
+    # Quits the run's browsers at its deadline, so a scraper blocked in a WebDriver call still stops
+    timer = threading.Timer(max(0, config.deadline - time.time()), config.expire)
+    timer.daemon = True
+    timer.start()
+    try: yield
+    finally: timer.cancel()
 
-def run_scraper(job_id, data):
-    temp_script = None
+def timed_out(config):
+    # Calls cut off by the watchdog fail with driver errors; they are reported as the timeout they are
+    return config is not None and config.deadline is not None and time.time() >= config.deadline
+
+def mark_running(job):
+    job.pop('queue_position')
+    job.update(status='running', progress='Initializing...',
+               wait_seconds=round(time.time() - job.get('queued_at', time.time()), 2))
+
+def uses_browser(platform_name, config):
+    return not (platform_name == 'rubyonremote' and config.engine == 'http')
+
+def run_scraper(job_id, data, resume=False):
+    pooled = None
+    config = None
+    checkpoint = None
     platform_name = data.get('platform')
+    status = 'error'
+    started = time.time()
     
+    modify_job(job_id, mark_running)
+
     try:
-        # 1. Select Template
-        script_template = 'linkedin_scraper.py' if platform_name == 'linkedin' else 'rubyonremote_scraper.py'
-        
-        if not os.path.exists(script_template):
-            raise FileNotFoundError(f"Script template {script_template} not found")
-        
-        # 2. Prepare Configured Script
-        with open(script_template, 'r', encoding='utf-8') as f:
-            content = f.read()
-        
-        # Inject Variables
-        content = re.sub(r'JOB_KEYWORDS\s*=\s*["\'].*?["\']', f'JOB_KEYWORDS = "{data.get("job_keywords")}"', content)
-        content = re.sub(r'JOB_LOCATION\s*=\s*["\'].*?["\']', f'JOB_LOCATION = "{data.get("job_location")}"', content)
-        content = re.sub(r'MAX_PAGES_TO_SCRAPE\s*=\s*\d+', f'MAX_PAGES_TO_SCRAPE = {data.get("max_pages", 1)}', content)
-        content = re.sub(r'HEADLESS\s*=\s*(True|False)', f'HEADLESS = {data.get("headless", False)}', content)
-        
-        temp_script = f'temp_{platform_name}_{job_id}.py'
-        with open(temp_script, 'w', encoding='utf-8') as f:
-            f.write(content)
-            
-        # 3. Execute with UNBUFFERED Output (-u)
-        scraping_jobs[job_id]['progress'] = 'Launching browser...'
-        
-        process = subprocess.Popen(
-            ['python3', '-u', temp_script], # -u IS CRITICAL FOR REAL-TIME LOGS
-            stdout=subprocess.PIPE,
-            stderr=subprocess.PIPE,
-            text=True,
-            bufsize=1, # Line buffered
-            universal_newlines=True
-        )
-        
-        # 4. Monitor Output Loop
-        start_time = time.time()
-        timeout = 900 # 15 minutes max
-        
-        while True:
-            # Check for timeout
-            if time.time() - start_time > timeout:
-                process.kill()
-                raise TimeoutError("Script timed out.")
-
-            # Non-blocking read
-            output = process.stdout.readline()
-            
-            if output == '' and process.poll() is not None:
-                break
-            
-            if output:
-                line = output.strip()
-                print(f"[JOB {job_id}] {line}") # Server log
-                
-                # --- Real-time Progress Parsing ---
-                
-                # 1. Page Loading
-                if "Scraping Page" in line:
-                    scraping_jobs[job_id]['progress'] = line
-                elif "Loading jobs" in line:
-                    scraping_jobs[job_id]['progress'] = "Loading job list..."
-                elif "Loaded" in line and "jobs" in line:
-                    # Example: "Loaded 15 jobs..."
-                    scraping_jobs[job_id]['progress'] = line
-
-                # 2. Processing Individual Jobs
-                # LinkedIn: "[5/25] Processing ID: 123"
-                elif "Processing ID" in line:
-                    scraping_jobs[job_id]['progress'] = f"Analyzing job..."
-                
-                # 3. Successful Scrape
-                # LinkedIn: "   -> Captured: Senior Engineer"
-                # Ruby: "Scraped: Senior Engineer"
-                elif "Captured:" in line or "Scraped:" in line:
-                    scraping_jobs[job_id]['jobs_processed'] += 1
-                    count = scraping_jobs[job_id]['jobs_processed']
-                    title = line.split(":", 1)[1].strip()[:30] # Get title preview
-                    scraping_jobs[job_id]['progress'] = f"Saved: {title}..."
-
-        # 5. Check Exit Code
-        stderr_output = process.stderr.read()
-        
-        if process.returncode == 0:
-            scraping_jobs[job_id]['status'] = 'completed'
-            scraping_jobs[job_id]['progress'] = 'Completed successfully.'
-            
-            # Move File logic
-            # Determine expected filename based on scraper logic
-            if platform_name == 'linkedin':
-                old_name = f"linkedin_{data.get('job_keywords').replace(' ', '_')[:20]}_{data.get('job_location').replace(' ', '_')[:20]}.csv"
-            else:
-                k_slug = slugify(data.get('job_keywords'))
-                l_slug = slugify(data.get('job_location'))
-                old_name = f"rubyonremote_{k_slug}_{l_slug}.csv"
-            
-            new_name = f"{platform_name}_{job_id}_{scraping_jobs[job_id]['timestamp']}.csv"
-            new_path = os.path.join(OUTPUT_DIR, new_name)
-            
-            if os.path.exists(old_name):
-                import shutil
-                shutil.move(old_name, new_path)
-                scraping_jobs[job_id]['output_file'] = new_path
-                # Count
-                with open(new_path, 'r', encoding='utf-8') as f:
-                    scraping_jobs[job_id]['results_count'] = sum(1 for _ in f) - 1
-            else:
-                # If file not found, try finding ANY csv created recently (fallback)
-                scraping_jobs[job_id]['error'] = "Output file could not be renamed automatically."
-                
+        # 1. Select Scraper
+        scraper = SCRAPERS.get(platform_name)
+        if scraper is None:
+            raise ValueError(f"Unknown platform: {platform_name}")
+
+        config = ScrapeConfig.from_payload(data)
+        config.deadline = started + JOB_TIMEOUT
+        config.log = lambda line: handle_log(job_id, line)
+        config.progress = ProgressReporter(lambda event: handle_progress(job_id, event, platform_name))
+        config.seen_index = seen_index
+        config.page_cache = page_cache
+        config.debugging_port = allocate_port()
+        # Opt-in WebDriver tracing: "trace": true keeps a per-command summary, "chrome" also a trace file
+        if data.get('trace'):
+            config.driver_trace = DriverTrace(keep_events=data.get('trace') == 'chrome')
+
+        # Checkpoint: a resumed job continues from the state its last run saved
+        if resume:
+            checkpoint = Checkpoint.load(Checkpoint.for_job(job_id).path)
+            if checkpoint is None:
+                raise FileNotFoundError("No checkpoint to resume from.")
         else:
-            raise Exception(f"Script Error: {stderr_output}")
+            checkpoint = Checkpoint.for_job(job_id)
+            checkpoint.state = {'payload': data, 'job': job_store.read(job_id)}
+        config.checkpoint = checkpoint
+
+        # 2. Lease a warm browser (pool browsers are headless)
+        needs_browser = uses_browser(platform_name, config)
+        if needs_browser and config.headless and DRIVER_POOL_SIZE > 0:
+            update_job(job_id, progress='Waiting for a browser...')
+            with config.progress.phase('driver_lease'):
+                pooled = driver_pool.acquire(timeout=DRIVER_LEASE_TIMEOUT)
+            if pooled:
+                config.driver = pooled.driver
+                BlockStats().collect(pooled.driver)  # Drop network events left over from the previous job
+            config.lease_driver = lease_extra_driver
+
+        if needs_browser:
+            update_job(job_id, progress='Browser ready...' if pooled else 'Launching browser...')
+
+        # 3. Run scraper in this worker thread, streaming every record to disk
+        base_path = os.path.join(OUTPUT_DIR, f"{platform_name}_{job_id}_{job_store.get(job_id)['timestamp']}")
+        sink = RecordSink(base_path, scraper.FIELDNAMES, output_formats(data), resume=checkpoint.state.get('sink'),
+                          compression=OUTPUT_COMPRESSION)
+        checkpoint.bind(sink)
+        resumable = getattr(scraper, 'RESUMABLE', True)  # Multi-platform runs cannot resume (see fanout.py)
+        if resumable: checkpoint.save()
+        update_job(job_id, jobs_processed=sink.count)
+
+        results = scraper.scrape(config)
+        try:
+            with watchdog(config):
+                for record in results:
+                    sink.write(record)
+                    if resumable: checkpoint.maybe_save()
+                    update_job(job_id, jobs_processed=sink.count)
+                    config.check_deadline()
+        except BaseException:
+            if not resumable:
+                sink.abort(keep_partial=False)
+                raise
+            # Keep the partial output and a final checkpoint so /api/resume can pick up from here
+            checkpoint.save()
+            sink.abort()
+            for fmt in sink.formats:
+                if os.path.exists(sink.part_path(fmt)): retention.add(sink.part_path(fmt), job_id)
+            update_job(job_id, resumable=True)
+            raise
+        finally:
+            results.close()
+
+        # 4. Publish Output
+        with config.progress.phase('output_publish'):
+            output_files = sink.close()
+            checkpoint.delete()
+            for path in output_files: retention.add(path, job_id)
+        update_job(job_id,
+                   output_file=output_files[0],
+                   output_files=output_files,
+                   results_count=sink.manifests[sink.formats[0]]['rows'],
+                   output_bytes=sum(m['bytes'] for m in sink.manifests.values()),
+                   resumable=False,
+                   status='completed',
+                   progress='Completed successfully.')
+        status = 'completed'
 
     except Exception as e:
-        scraping_jobs[job_id]['status'] = 'error'
-        scraping_jobs[job_id]['error'] = str(e)
+        update_job(job_id, status='error', error="Scraper timed out." if timed_out(config) else str(e))
         print(f"[JOB {job_id} ERROR] {e}")
     
     finally:
-        if temp_script and os.path.exists(temp_script):
-            try: os.remove(temp_script)
-            except: pass
+        JOBS_TOTAL.inc(platform=platform_name, status=status)
+        JOB_SECONDS.observe(time.time() - started, platform=platform_name, status=status)
+        if config is not None:
+            update_job(job_id, waits=config.wait_stats.summary(), network=config.block_stats.summary())
+            if config.driver_trace:
+                trace = config.driver_trace
+                trace_file = None
+                if trace.keep_events:
+                    try: trace_file = trace.export(os.path.join(TRACE_DIR, f"job_{job_id}.json"))
+                    except OSError as e: print(f"[JOB {job_id}] Trace export failed: {e}")
+                update_job(job_id, webdriver=trace.summary(), trace_file=trace_file)
+        if pooled:
+            driver_pool.release(pooled)
+
+def track_query(job_id, n, platform, event):
+    # Progress of one batch query, kept under job['queries'][n]; the job's jobs_found is their sum
+    kind = event['type']
+    observe_progress(platform, event)
+    if kind not in ('page', 'found', 'record', 'skipped', 'error'): return
+    def track(job):
+        q = job['queries'][n]
+        if kind == 'page':
+            q['current_page'] = event['page']
+        elif kind == 'found':
+            found = q.setdefault('found', {})
+            found[event.get('platform', platform)] = event['total']
+            q['jobs_found'] = sum(found.values())
+            job['jobs_found'] = sum(query['jobs_found'] for query in job['queries'])
+        elif kind == 'record':
+            q['records'] += 1
+            if event.get('reused'): q['reused'] = q.get('reused', 0) + 1
+        else:
+            counter = 'jobs_skipped' if kind == 'skipped' else 'errors'
+            q[counter] = q.get(counter, 0) + 1
+    modify_job(job_id, track)
+
+def update_query(job_id, n, **fields):
+    def change(job):
+        job['queries'][n].update(fields)
+        done = sum(1 for q in job['queries'] if q['status'] in ('completed', 'error'))
+        job['progress'] = f"Running queries ({done} of {len(job['queries'])} done)..."
+    modify_job(job_id, change)
+
+def run_batch(job_id, data, queries):
+    status = 'error'
+    started = time.time()
+    modify_job(job_id, mark_running)
+    registry = batch.DetailRegistry(seen_index)  # Postings fetched by one query are reused by the others
+    wait_stats, block_stats = WaitStats(), BlockStats()
+    base_path = os.path.join(OUTPUT_DIR, f"batch_{job_id}_{job_store.get(job_id)['timestamp']}")
+    combined = None
+    tasks = queue.Queue()
+    for item in enumerate(queries):
+        tasks.put(item)
+
+    def run_query(n, payload, driver):
+        platform_name = payload['platform']
+        scraper = SCRAPERS[platform_name]
+        config = ScrapeConfig.from_payload(payload)
+        config.deadline = time.time() + JOB_TIMEOUT
+        config.log = lambda line: handle_log(job_id, f"[query {n + 1}] {line}")
+        config.progress = ProgressReporter(lambda event: track_query(job_id, n, platform_name, event))
+        config.seen_index = registry
+        config.page_cache = page_cache
+        config.debugging_port = allocate_port()
+        config.driver = driver
+        config.lease_driver = lease_extra_driver if config.headless else None  # Pool browsers are headless
+        config.wait_stats, config.block_stats = wait_stats, block_stats
+        sink = RecordSink(f"{base_path}_q{n + 1}", scraper.FIELDNAMES, output_formats(payload),
+                          compression=OUTPUT_COMPRESSION)
+        records = scraper.scrape(config)
+        try:
+            with watchdog(config):
+                for record in records:
+                    sink.write(record)
+                    combined.write(n, payload, record)
+                    update_job(job_id, jobs_processed=combined.sink.count)
+                    config.check_deadline()
+        except BaseException:
+            sink.abort(keep_partial=False)
+            if timed_out(config): raise TimeoutError("Query timed out.")
+            raise
+        finally:
+            records.close()
+            registry.release()
+        output_files = sink.close()
+        for path in output_files: retention.add(path, job_id)
+        return output_files, sink.manifests[sink.formats[0]]['rows']
+
+    def worker():
+        # Each worker keeps one pooled browser for all the queries it runs
+        pooled = None
+        try:
+            while True:
+                try: n, payload = tasks.get_nowait()
+                except queue.Empty: return
+                update_query(job_id, n, status='running')
+                try:
+                    driver = None
+                    if DRIVER_POOL_SIZE > 0 and uses_browser(payload['platform'], ScrapeConfig.from_payload(payload)):
+                        if not payload.get('headless'):  # Pool browsers are headless: launch a visible one, like /api/scrape
+                            handle_log(job_id, f"[query {n + 1}] \"headless\" is off, launching a visible browser instead of a pooled one")
+                        else:
+                            if pooled is None:
+                                pooled = driver_pool.acquire(timeout=DRIVER_LEASE_TIMEOUT)
+                                if pooled: BlockStats().collect(pooled.driver)  # Drop network events left over from the previous job
+                            driver = pooled.driver if pooled else None
+                    output_files, rows = run_query(n, payload, driver)
+                    update_query(job_id, n, status='completed', output_files=output_files, results_count=rows)
+                except Exception as e:
+                    update_query(job_id, n, status='error', error=str(e))
+                    print(f"[JOB {job_id} QUERY {n + 1} ERROR] {e}")
+                    if isinstance(e, TimeoutError) and pooled:
+                        driver_pool.release(pooled)  # Quit by the watchdog: the next query leases another
+                        pooled = None
+        finally:
+            if pooled: driver_pool.release(pooled)
+
+    try:
+        combined = batch.CombinedOutput(RecordSink(base_path, batch.FIELDNAMES, output_formats(data),
+                                                   compression=OUTPUT_COMPRESSION))
+        threads = [threading.Thread(target=worker, daemon=True) for _ in range(max(1, min(BATCH_BROWSERS, len(queries))))]
+        for t in threads: t.start()
+        for t in threads: t.join()
+
+        results = job_store.read(job_id)['queries']
+        if not any(q['status'] == 'completed' for q in results):
+            combined.sink.abort(keep_partial=False)
+            raise RuntimeError(f"All {len(results)} queries failed (first error: {results[0].get('error')})")
+        output_files = combined.sink.close()
+        for path in output_files: retention.add(path, job_id)
+        failed = sum(1 for q in results if q['status'] != 'completed')
+        update_job(job_id,
+                   output_file=output_files[0],
+                   output_files=output_files + [p for q in results for p in q.get('output_files', [])],
+                   results_count=combined.sink.manifests[combined.sink.formats[0]]['rows'],
+                   details=registry.stats(),
+                   status='completed',
+                   progress=f"Completed ({failed} of {len(results)} queries failed)." if failed else 'Completed successfully.')
+        status = 'completed'
+    except Exception as e:
+        update_job(job_id, status='error', error=str(e))
+        print(f"[JOB {job_id} ERROR] {e}")
+    finally:
+        JOBS_TOTAL.inc(platform='batch', status=status)
+        JOB_SECONDS.observe(time.time() - started, platform='batch', status=status)
+        update_job(job_id, waits=wait_stats.summary(), network=block_stats.summary())
 
 @app.route('/api/status/<int:job_id>')
 def get_status(job_id):
-    return jsonify(scraping_jobs.get(job_id, {'error': 'Not found'}))
+    if job_store.get(job_id) is None: return jsonify({'error': 'Not found'})
+    wait_for_change(lambda: job_store.get(job_id).version)
+    return snapshot_response(job_store.snapshot(job_id))
 
 @app.route('/api/download/<int:job_id>')
 def download_results(job_id):
-    job = scraping_jobs.get(job_id)
+    job = job_store.read(job_id)
     if not job or not job.get('output_file'): return jsonify({'error': 'File not found'}), 404
-    return send_file(job['output_file'], as_attachment=True)
+    path = job['output_file']
+    candidates = job.get('output_files', [])
+    query = request.args.get('query', type=int)  # Batch jobs: one query's own output (1-based)
+    if query is not None:
+        queries = job.get('queries') or []
+        if not 1 <= query <= len(queries) or not queries[query - 1].get('output_files'):
+            return jsonify({'error': f'No output for query {query}'}), 404
+        candidates = queries[query - 1]['output_files']
+        path = candidates[0]
+    fmt = request.args.get('format')
+    if fmt:
+        matches = [p for p in candidates if output_format(p) == fmt]
+        if not matches: return jsonify({'error': f'No {fmt} output for this job'}), 404
+        path = matches[0]
+    if not os.path.exists(path): return jsonify({'error': 'File not found'}), 404
+    retention.touch(path)
+    return serve_output(path, request)
+
+@app.route('/api/trace/<int:job_id>')
+def download_trace(job_id):
+    # Chrome trace JSON of a job run with "trace": "chrome"; open it in chrome://tracing or Perfetto
+    job = job_store.read(job_id)
+    if not job or not job.get('trace_file'): return jsonify({'error': 'No trace for this job'}), 404
+    return send_file(job['trace_file'], as_attachment=True)
+
+@app.route('/api/resume/<int:job_id>', methods=['POST'])
+def resume_job(job_id):
+    checkpoint = Checkpoint.load(Checkpoint.for_job(job_id).path)
+    if checkpoint is None: return jsonify({'error': 'No checkpoint for this job'}), 404
+
+    with job_store.lock:
+        job = job_store.get(job_id)
+        if job and job.get('status') in ('queued', 'running'):
+            return jsonify({'error': f"Job is still {job.get('status')}"}), 409
+        if job is None:
+            job_store.create(dict(checkpoint.state.get('job', {})), job_id=job_id)
+        def restart(job):
+            job.pop('error')
+            job.update({'status': 'queued', 'progress': 'Queued to resume...', 'queued_at': time.time()})
+        modify_job(job_id, restart)
+
+    payload = checkpoint.state['payload']
+    try:
+        position = scheduler.submit(job_id, lane_for(int(payload.get('max_pages') or 1)), run_scraper, job_id, payload, True)
+    except QueueFull as e:
+        update_job(job_id, status='error', error=str(e))
+        return jsonify({'job_id': job_id, 'error': str(e)}), 429
+    return jsonify({'job_id': job_id, 'status': 'queued', 'queue_position': position})
+
+@app.route('/api/events')
+def stream_events():
+    # Push channel for job progress and history changes (replaces per-tab polling)
+    subscriber = event_broker.subscribe()
+    return Response(event_broker.stream(subscriber), mimetype='text/event-stream',
+                    headers={'Cache-Control': 'no-cache', 'X-Accel-Buffering': 'no'})
+
+@app.route('/api/pool')
+def pool_stats():
+    return jsonify(dict(driver_pool.stats(), profiles=profiles.stats()))
+
+@app.route('/api/scheduler')
+def scheduler_stats():
+    return jsonify(scheduler.stats())
+
+@app.route('/api/cache')
+def cache_stats():
+    return jsonify(page_cache.stats())
+
+@app.route('/metrics')
+def prometheus_metrics():
+    return Response(metrics.render(), content_type=CONTENT_TYPE)
+
+@app.route('/api/storage')
+def storage_stats():
+    return jsonify(retention.stats())
 
 @app.route('/api/jobs')
 def list_jobs():
-    # Return jobs sorted by ID descending
-    return jsonify({'jobs': [
-        {**v, 'job_id': k} 
-        for k, v in sorted(scraping_jobs.items(), key=lambda item: item[0], reverse=True)
-    ]})
+    # Newest first, one page at a time (?limit=&offset=, optional ?status= and ?platform= filters)
+    limit = min(request.args.get('limit', JOBS_PAGE_SIZE, type=int), JOBS_PAGE_MAX)
+    offset = request.args.get('offset', 0, type=int)
+    wait_for_change(lambda: job_store.version)
+    page = job_store.list(limit=limit, offset=offset,
+                          status=request.args.get('status'), platform=request.args.get('platform'))
+    return snapshot_response(page)
+
+def open_stores():
+    """Creates the output directory and opens the on-disk stores (in the working directory)."""
+    global job_store, seen_index, page_cache, retention
+    os.makedirs(OUTPUT_DIR, exist_ok=True)
+    job_store = JobStore()
+    atexit.register(job_store.flush_all)  # Running jobs' latest progress is written lazily
+    seen_index = SeenIndex()
+    page_cache = PageCache()
+    retention = RetentionManager(OUTPUT_DIR, on_evict=forget_outputs)
 
 if __name__ == '__main__':
-    start_cleanup_thread()
-    app.run(debug=True, port=5000)
\ No newline at end of file
+    open_stores()
+    restore_interrupted_jobs()
+    retention.start()
+    profiles.start_pruning()
+    driver_pool.start()
+    scheduler.start()
+    app.run(debug=True, port=5000, use_reloader=False)
\ No newline at end of file
@@ -0,0 +1,151 @@
+import threading
+import time
+
+import fanout
+from fanout import dedupe_key, unify
+from record_sink import FORMATS
+from seen_index import HighWaterMark
+
+# --- Configuration ---
+MAX_QUERIES = 50       # Queries accepted in one batch
+CLAIM_WAIT = 300       # Seconds a query waits for postings another query of the batch is fetching
+QUERY_FIELDS = ("platform", "job_keywords", "job_location", "max_pages", "workplace_type", "engine", "incremental")
+
+# Combined output: the unified schema plus the query that first found the posting
+FIELDNAMES = ["query"] + fanout.FIELDNAMES
+
+def plan(data):
+    """Expands a /api/batch payload into one /api/scrape-style payload per distinct query.
+
+    Top-level fields are defaults for every query; identical queries are run once.
+    Raises ValueError for an empty or oversized batch, or an unknown output_format.
+    """
+    queries = data.get('queries')
+    if not isinstance(queries, list) or not queries:
+        raise ValueError("'queries' must be a non-empty list")
+    defaults = {k: v for k, v in data.items() if k != 'queries'}
+    for fields in [defaults] + queries:  # The defaults' format is the combined output's
+        fmt = (fields.get('output_format') or 'csv') if isinstance(fields, dict) else 'csv'
+        if fmt != 'both' and fmt not in FORMATS:
+            raise ValueError(f"Unknown output_format: {fmt} (use {', '.join(FORMATS)} or both)")
+    payloads = []
+    seen = set()
+    for query in queries:
+        payload = dict(defaults, **query)
+        payload.setdefault('platform', 'linkedin')
+        key = tuple(str(payload.get(k) or '').strip().lower() for k in QUERY_FIELDS)
+        if key in seen: continue
+        seen.add(key)
+        payloads.append(payload)
+    if len(payloads) > MAX_QUERIES:
+        raise ValueError(f"A batch can have at most {MAX_QUERIES} distinct queries")
+    return payloads
+
+def describe(payload):
+    return f"{payload['platform']}: {payload.get('job_keywords') or ''} / {payload.get('job_location') or ''}"
+
+# --- Detail Registry ---
+class DetailRegistry:
+    """Postings fetched by any query of a batch, in front of the seen index. Shared by every query thread.
+
+    Scrapers use it as their seen index. lookup() returns postings already fetched in this batch
+    (whatever their age) and hands each unknown one to a single caller; a caller asking for a posting
+    another query is still fetching waits for its record, at most CLAIM_WAIT seconds in total.
+    """
+    def __init__(self, seen_index=None, wait=CLAIM_WAIT):
+        self.seen_index = seen_index
+        self.wait = wait
+        self._cond = threading.Condition()
+        self._records = {}
+        self._claims = {}   # (platform, posting_id) -> thread fetching it
+        self._waiting = set()
+        self._stats = {"fetched": 0, "shared": 0, "waited": 0.0}
+
+    def lookup(self, platform, posting_ids, fresh_for):
+        ids = list(dict.fromkeys(i for i in posting_ids if i))
+        me = threading.current_thread()
+        with self._cond:
+            found = {i: self._records[(platform, i)] for i in ids if (platform, i) in self._records}
+            self._stats["shared"] += len(found)
+        missing = [i for i in ids if i not in found]
+        if self.seen_index and missing:
+            found.update(self.seen_index.lookup(platform, missing, fresh_for))
+        deadline = time.time() + self.wait
+        started = time.time()
+        with self._cond:
+            self._waiting.add(me)
+            try:
+                for posting_id in ids:
+                    if posting_id in found: continue
+                    key = (platform, posting_id)
+                    while key not in self._records:
+                        owner = self._claims.get(key)
+                        # Fetch it ourselves if nobody is, or its fetcher is gone or itself waiting (a possible cycle)
+                        if owner is None or owner is me or not owner.is_alive() or owner in self._waiting:
+                            self._claims[key] = me
+                            break
+                        remaining = deadline - time.time()
+                        if remaining <= 0: break
+                        self._cond.wait(min(remaining, 1.0))
+                    if key in self._records:
+                        found[posting_id] = self._records[key]
+                        self._stats["shared"] += 1
+            finally:
+                self._waiting.discard(me)
+                self._stats["waited"] += time.time() - started
+        return found
+
+    def put(self, platform, posting_id, record):
+        if not posting_id: return False
+        changed = self.seen_index.put(platform, posting_id, record) if self.seen_index else False
+        with self._cond:
+            self._records[(platform, posting_id)] = record
+            self._claims.pop((platform, posting_id), None)
+            self._stats["fetched"] += 1
+            self._cond.notify_all()
+        return changed
+
+    def fail(self, platform, posting_id):
+        """Drops this thread's claim on a posting it could not fetch (error or no title), so waiters fetch it themselves."""
+        me = threading.current_thread()
+        with self._cond:
+            if self._claims.get((platform, posting_id)) is me:
+                del self._claims[(platform, posting_id)]
+                self._cond.notify_all()
+
+    def high_water(self, query):
+        return self.seen_index.high_water(query) if self.seen_index else HighWaterMark()
+
+    def raise_high_water(self, query, posting_ids, newest_date=None):
+        if self.seen_index: return self.seen_index.raise_high_water(query, posting_ids, newest_date)
+
+    def release(self, thread=None):
+        """Drops the claims of a thread whose query ended, so queries waiting on them fetch the postings themselves."""
+        thread = thread or threading.current_thread()
+        with self._cond:
+            for key in [k for k, owner in self._claims.items() if owner is thread]:
+                del self._claims[key]
+            self._cond.notify_all()
+
+    def stats(self):
+        with self._cond:
+            return dict(self._stats, waited=round(self._stats["waited"], 2), postings=len(self._records))
+
+# --- Combined Output ---
+class CombinedOutput:
+    """Every query's records in the unified schema, each posting once. Shared by the query threads."""
+    def __init__(self, sink):
+        self.sink = sink
+        self._lock = threading.Lock()
+        self._seen = set()
+
+    def write(self, n, payload, record):
+        if payload['platform'] != 'all':
+            record = unify(payload['platform'], record)
+        key = (record['platform'], record['posting_id']) if record.get('posting_id') else dedupe_key(record)
+        with self._lock:
+            if key is not None:
+                if key in self._seen: return False
+                self._seen.add(key)
+            self.sink.write(dict(record, query=n + 1))
+            return True
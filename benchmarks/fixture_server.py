@@ -0,0 +1,201 @@
+"""Local stand-ins for RubyOnRemote and LinkedIn, for benchmarks that must not touch the live sites.
+
+RubyOnRemote:  /remote-<keywords>-jobs[-in-<location>]/?page=N   list pages with rel=next pagination
+               /jobs/<id>-<slug>                                 server-rendered detail pages
+LinkedIn:      /feed/                                            "logged in" landing page
+               /jobs/search/?keywords=..&start=N                 cards lazy-loaded on scroll, detail pane
+               /linkedin/job/<id>                                detail JSON the pane fetches on click
+
+Run it standalone with `python benchmarks/fixture_server.py --port 8800`.
+"""
+import argparse
+import html
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+# --- Configuration ---
+RUBY_PAGES = 3
+RUBY_JOBS_PER_PAGE = 20
+LINKEDIN_PAGES = 3
+LINKEDIN_JOBS_PER_PAGE = 25
+LINKEDIN_FIRST_BATCH = 7    # Cards rendered before the first scroll
+LINKEDIN_BATCH = 6          # Cards appended per scroll
+LATENCY_MS = 50             # Added to every response, like a real network
+SEED = 7
+
+TITLES = ["Senior Rails Developer", "Ruby Engineer", "Backend Engineer (Ruby)", "Full-Stack Rails Developer",
+          "Staff Software Engineer", "Platform Engineer", "Ruby on Rails Contractor", "Lead Backend Developer"]
+COMPANIES = ["Acme", "Globex", "Initech", "Umbrella", "Hooli", "Vandelay", "Stark Industries", "Wonka"]
+WORDS = ("ruby rails postgres redis sidekiq api team remote product customers deploy review test "
+         "design scale service queue cache tooling observability mentor ship").split()
+
+def synthetic_job(job_id):
+    rng = random.Random(SEED * 100003 + job_id)
+    paragraphs = [" ".join(rng.choice(WORDS) for _ in range(60)) for _ in range(6)]
+    return {
+        "id": job_id,
+        "title": rng.choice(TITLES),
+        "company": rng.choice(COMPANIES),
+        "location": rng.choice(["Remote", "Tokyo, Japan", "Hanoi, Vietnam", "Berlin, Germany"]),
+        "date": f"2026-{rng.randint(1, 9):02d}-{rng.randint(1, 28):02d}",
+        "description": paragraphs,
+    }
+
+def slug(text):
+    return "-".join("".join(c if c.isalnum() else " " for c in text.lower()).split())
+
+# --- Pages ---
+def ruby_list_page(path, page):
+    first = 1000 + (page - 1) * RUBY_JOBS_PER_PAGE
+    items = "".join(
+        f'<li><a href="/jobs/{job_id}-{slug(synthetic_job(job_id)["title"])}">{html.escape(synthetic_job(job_id)["title"])}</a></li>'
+        for job_id in range(first, first + RUBY_JOBS_PER_PAGE))
+    next_link = f'<a rel="next" href="{path}?page={page + 1}">Next</a>' if page < RUBY_PAGES else ""
+    return f"<html><body><ul>{items}</ul><nav>{next_link}</nav></body></html>"
+
+def ruby_detail_page(job_id):
+    job = synthetic_job(job_id)
+    body = "".join(f"<p>{p}</p>" for p in job["description"])
+    return f"""<html><body>
+<h1 class="schema-job-title">{html.escape(job["title"])}</h1>
+<div class="rounded-lg"><h3>{html.escape(job["company"])}</h3></div>
+<h2>Published on {job["date"]}</h2>
+<div class="schema-job-description">{body}</div>
+</body></html>"""
+
+LINKEDIN_SEARCH_JS = """
+var jobs = %(jobs)s, shown = 0, loading = false;
+var list = document.getElementById('list');
+function card(id) {
+  var div = document.createElement('div');
+  div.className = 'job-card-container';
+  div.setAttribute('data-job-id', id);
+  div.innerHTML = '<a href="/jobs/view/' + id + '/">Job ' + id + '</a>';
+  div.style.height = '90px';
+  div.onclick = function () { openJob(id); };
+  return div;
+}
+function more(n) {
+  for (var i = 0; i < n && shown < jobs.length; i++) list.appendChild(card(jobs[shown++]));
+}
+function lazy() {
+  if (loading || shown >= jobs.length) return;
+  loading = true;
+  setTimeout(function () { more(%(batch)d); loading = false; }, %(latency)d);
+}
+list.addEventListener('scroll', lazy);
+window.addEventListener('scroll', lazy);
+function openJob(id) {
+  // Like LinkedIn, the URL switches to the job on click, before its pane is rendered
+  var url = new URL(location.href);
+  url.searchParams.set('currentJobId', id);
+  history.replaceState(null, '', url.toString());
+  fetch('/linkedin/job/' + id).then(function (r) { return r.json(); }).then(function (job) {
+    document.getElementById('pane').innerHTML =
+      '<div class="job-details-jobs-unified-top-card__job-title"><h1>' + job.title + '</h1></div>' +
+      '<div class="job-details-jobs-unified-top-card__company-name"><a href="/company/' + job.id + '">' + job.company + '</a></div>' +
+      '<div class="job-details-jobs-unified-top-card__tertiary-description-container"><span>' + job.location + '</span></div>' +
+      '<div class="jobs-description__content">' + job.description.join('<br>') + '</div>';
+  });
+}
+var next = document.getElementById('next');
+if (next) next.onclick = function () {
+  var url = new URL(location.href);
+  url.searchParams.set('start', %(next_start)d);
+  url.searchParams.delete('currentJobId');
+  location.href = url.toString();
+};
+more(%(first)d);
+"""
+
+def linkedin_search_page(start):
+    page = start // LINKEDIN_JOBS_PER_PAGE + 1
+    first = 5000 + start
+    jobs = list(range(first, first + LINKEDIN_JOBS_PER_PAGE)) if page <= LINKEDIN_PAGES else []
+    next_button = ('<button aria-label="View next page" id="next">Next</button>' if page < LINKEDIN_PAGES
+                   else '<button aria-label="View next page" disabled>Next</button>')
+    script = LINKEDIN_SEARCH_JS % {"jobs": json.dumps(jobs), "batch": LINKEDIN_BATCH, "latency": LATENCY_MS,
+                                   "next_start": start + LINKEDIN_JOBS_PER_PAGE, "first": LINKEDIN_FIRST_BATCH}
+    return f"""<html><body>
+<div class="scaffold-layout__list" id="list" style="height: 400px; overflow-y: auto; width: 40%; float: left;"></div>
+<div id="pane" style="width: 55%; float: right;"></div>
+<div style="clear: both;">{next_button}</div>
+<script>{script}</script>
+</body></html>"""
+
+# --- Server ---
+class FixtureHandler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        parts = urlsplit(self.path)
+        query = parse_qs(parts.query)
+        self.server.record(parts.path)
+        time.sleep(self.server.latency)
+        path = parts.path
+        if path.startswith("/remote-"):
+            return self.send(ruby_list_page(path, int(query.get("page", ["1"])[0])))
+        if path.startswith("/jobs/search"):
+            return self.send(linkedin_search_page(int(query.get("start", ["0"])[0])))
+        if path.startswith("/jobs/") and path[6:].split("-")[0].isdigit():
+            return self.send(ruby_detail_page(int(path[6:].split("-")[0])))
+        if path.startswith("/linkedin/job/"):
+            return self.send(json.dumps(synthetic_job(int(path.rsplit("/", 1)[1]))), "application/json")
+        if path == "/feed/":
+            return self.send("<html><body><h1>Feed</h1></body></html>")
+        self.send_error(404)
+
+    def send(self, body, content_type="text/html; charset=utf-8"):
+        data = body.encode("utf-8")
+        self.send_response(200)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(data)))
+        self.end_headers()
+        self.wfile.write(data)
+
+class FixtureServer(ThreadingHTTPServer):
+    """Counts requests by kind of page so benchmarks can report fetches and first-request times."""
+    daemon_threads = True
+
+    def __init__(self, port=0, latency_ms=LATENCY_MS):
+        super().__init__(("127.0.0.1", port), FixtureHandler)
+        self.latency = latency_ms / 1000
+        self._lock = threading.Lock()
+        self.requests = {}
+        self.first_request_at = {}  # path -> time of its first request
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def record(self, path):
+        kind = path.strip("/").split("/")[0] or "root"
+        with self._lock:
+            self.requests[kind] = self.requests.get(kind, 0) + 1
+            self.first_request_at.setdefault(path, time.time())
+
+    def reset(self):
+        with self._lock:
+            self.requests = {}
+            self.first_request_at = {}
+
+    def start(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--port", type=int, default=8800)
+    parser.add_argument("--latency", type=int, default=LATENCY_MS, help="milliseconds added to every response")
+    args = parser.parse_args()
+    server = FixtureServer(args.port, args.latency)
+    print(f"Fixture server on {server.base_url}")
+    server.serve_forever()
+
+if __name__ == "__main__":
+    main()
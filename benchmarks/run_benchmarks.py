@@ -0,0 +1,233 @@
+"""Throughput benchmarks for the scrapers, run against the local fixture server.
+
+    python benchmarks/run_benchmarks.py                       # all scenarios
+    python benchmarks/run_benchmarks.py rubyonremote-http     # just one
+    python benchmarks/run_benchmarks.py --json out.json       # save results
+    python benchmarks/run_benchmarks.py --baseline out.json   # exit 1 on a regression
+
+Per scenario: records/sec, p50/p95 list page load, p50/p95 time from a detail page's request to
+its record, WebDriver round trips, fixture requests and peak RSS of the process tree (Chrome included).
+Records are also written to a checkpointed gzip output, which must decode in full from its first
+gzip member (as browsers decode Content-Encoding: gzip).
+"""
+import argparse
+import json
+import os
+import gzip
+import sys
+import tempfile
+import threading
+import time
+import zlib
+from urllib.parse import urlsplit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import linkedin_scraper
+import rubyonremote_scraper
+from driver_pool import DriverPool
+from driver_trace import DriverTrace
+from fixture_server import FixtureServer
+from progress import ProgressReporter
+from record_sink import RecordSink
+from scrape_config import ScrapeConfig
+
+# --- Configuration ---
+SCENARIOS = {
+    "rubyonremote-http": (rubyonremote_scraper, {"engine": "http", "max_pages": 3, "http_concurrency": 8}),
+    "rubyonremote-browser": (rubyonremote_scraper, {"engine": "browser", "max_pages": 3, "detail_delay": 0.0}),
+    "linkedin": (linkedin_scraper, {"max_pages": 3}),
+}
+REGRESSION_TOLERANCE = 0.15  # Allowed relative slowdown against a baseline
+RSS_SAMPLE_INTERVAL = 0.2
+CHECKPOINT_EVERY = 10  # Records between output checkpoints (each starts a new gzip member)
+READ_CHUNK = 1 << 20
+
+def percentile(values, pct):
+    if not values: return None
+    values = sorted(values)
+    return round(values[min(len(values) - 1, int(len(values) * pct / 100))], 4)
+
+# --- Measurements ---
+def tree_rss(root_pid):
+    """Resident memory in bytes of a process and all its descendants (Linux /proc)."""
+    children, rss = {}, {}
+    for name in os.listdir("/proc"):
+        if not name.isdigit(): continue
+        try:
+            with open(f"/proc/{name}/stat") as f:
+                fields = f.read().rsplit(")", 1)[1].split()
+            pid = int(name)
+            children.setdefault(int(fields[1]), []).append(pid)
+            rss[pid] = int(fields[21]) * os.sysconf("SC_PAGE_SIZE")
+        except (OSError, IndexError, ValueError):
+            continue
+    total, stack = 0, [root_pid]
+    while stack:
+        pid = stack.pop()
+        total += rss.get(pid, 0)
+        stack.extend(children.get(pid, []))
+    return total
+
+def first_gzip_member(path):
+    """Decompressed content of a gzip file's first member only: what HTTP decoders that stop there return."""
+    decoder = zlib.decompressobj(wbits=31)
+    chunks = []
+    with open(path, "rb") as f:
+        while not decoder.eof:
+            data = f.read(READ_CHUNK)
+            if not data: break
+            chunks.append(decoder.decompress(data))
+    return b"".join(chunks)
+
+class PeakRss:
+    def __init__(self):
+        self.peak = 0
+        self._stop = threading.Event()
+
+    def __enter__(self):
+        def sample():
+            while not self._stop.is_set():
+                self.peak = max(self.peak, tree_rss(os.getpid()))
+                self._stop.wait(RSS_SAMPLE_INTERVAL)
+        self._thread = threading.Thread(target=sample, daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc):
+        self._stop.set()
+        self._thread.join()
+
+# --- Runner ---
+def detail_path(scraper, record):
+    if scraper is linkedin_scraper:
+        return f"/linkedin/job/{record['linkedin_job_id']}"
+    return urlsplit(record["url"]).path
+
+def run_scenario(name, server, pool):
+    scraper, options = SCENARIOS[name]
+    events = []
+    config = ScrapeConfig(job_keywords="Ruby on Rails", job_location="Japan", headless=True,
+                          base_url=server.base_url, log=lambda line: None,
+                          progress=ProgressReporter(events.append), **options)
+    trace = DriverTrace()
+    pooled = None
+    if config.engine == "browser" or scraper is linkedin_scraper:
+        pooled = pool.acquire(timeout=60) if pool else None
+        if pooled is None:
+            return {"scenario": name, "skipped": "no browser available"}
+        config.driver = pooled.driver
+        config.driver_trace = trace
+
+    server.reset()
+    record_times = {}
+    output_dir = tempfile.TemporaryDirectory()
+    sink = RecordSink(os.path.join(output_dir.name, name), scraper.FIELDNAMES, compression="gzip")
+    sink.checkpoint()  # Right after the header, as app.py's first checkpoint
+    started = time.time()
+    try:
+        with PeakRss() as rss:
+            for record in scraper.scrape(config):
+                record_times[detail_path(scraper, record)] = time.time()
+                sink.write(record)
+                if sink.count % CHECKPOINT_EVERY == 0: sink.checkpoint()
+    finally:
+        if pooled:
+            pool.release(pooled)
+    elapsed = time.time() - started
+    with output_dir:
+        path = sink.close()[0]
+        with gzip.open(path, "rb") as f:
+            output_complete = first_gzip_member(path) == f.read()
+    webdriver = trace.summary()
+
+    list_loads = [e["duration"] for e in events if e["type"] == "phase_end" and e["phase"] == "list_load"]
+    detail_latencies = [at - server.first_request_at[path] for path, at in record_times.items()
+                        if path in server.first_request_at]
+    return {
+        "scenario": name,
+        "records": len(record_times),
+        "seconds": round(elapsed, 3),
+        "records_per_sec": round(len(record_times) / elapsed, 3) if elapsed else None,
+        "list_p50": percentile(list_loads, 50),
+        "list_p95": percentile(list_loads, 95),
+        "detail_p50": percentile(detail_latencies, 50),
+        "detail_p95": percentile(detail_latencies, 95),
+        "webdriver_round_trips": webdriver["commands"],
+        "webdriver_commands": {name: s["count"] for name, s in list(webdriver["by_command"].items())[:8]},
+        "webdriver_call_sites": {site: s["count"] for site, s in list(webdriver["by_call_site"].items())[:8]},
+        "fixture_requests": dict(server.requests),
+        "peak_rss_mb": round(rss.peak / 2**20, 1),
+        "errors": sum(1 for e in events if e["type"] == "error"),
+        "gzip_first_member_complete": output_complete,
+    }
+
+def regressions(results, baseline, tolerance):
+    """Scenarios that got slower than the baseline by more than tolerance."""
+    previous = {r["scenario"]: r for r in baseline}
+    found = []
+    for r in results:
+        old = previous.get(r["scenario"])
+        if not old or r.get("skipped") or old.get("skipped"): continue
+        if r["records_per_sec"] < old["records_per_sec"] * (1 - tolerance):
+            found.append(f"{r['scenario']}: {old['records_per_sec']} -> {r['records_per_sec']} records/sec")
+        for key in ("list_p95", "detail_p95"):
+            if old.get(key) and r.get(key) and r[key] > old[key] * (1 + tolerance):
+                found.append(f"{r['scenario']}: {key} {old[key]} -> {r[key]} s")
+    return found
+
+def print_table(results):
+    columns = ["scenario", "records", "records_per_sec", "list_p50", "list_p95", "detail_p50", "detail_p95",
+               "webdriver_round_trips", "peak_rss_mb", "errors"]
+    print("  ".join(f"{c:>14}" for c in columns))
+    for r in results:
+        if r.get("skipped"):
+            print(f"{r['scenario']:>14}  skipped: {r['skipped']}")
+            continue
+        print("  ".join(f"{str(r.get(c)):>14}" for c in columns))
+
+def main():
+    parser = argparse.ArgumentParser(description="Scraper throughput benchmarks against a local fixture server.")
+    parser.add_argument("scenarios", nargs="*", help=f"any of {', '.join(SCENARIOS)} (default: all)")
+    parser.add_argument("--latency", type=int, default=50, help="fixture response latency in milliseconds")
+    parser.add_argument("--json", help="write results to this file")
+    parser.add_argument("--baseline", help="results file to compare against; exit 1 on regressions")
+    parser.add_argument("--tolerance", type=float, default=REGRESSION_TOLERANCE)
+    args = parser.parse_args()
+    unknown = [name for name in args.scenarios if name not in SCENARIOS]
+    if unknown: parser.error(f"unknown scenario: {', '.join(unknown)}")
+    args.scenarios = args.scenarios or list(SCENARIOS)
+
+    server = FixtureServer(latency_ms=args.latency).start()
+    needs_browser = any(name != "rubyonremote-http" for name in args.scenarios)
+    pool = DriverPool(size=1, headless=True) if needs_browser else None
+    if pool: pool.start()
+    try:
+        results = []
+        for name in args.scenarios:
+            print(f"Running {name}...", file=sys.stderr)
+            try:
+                results.append(run_scenario(name, server, pool))
+            except Exception as e:
+                results.append({"scenario": name, "skipped": f"failed: {e}"})
+    finally:
+        if pool: pool.close()
+        server.shutdown()
+
+    print_table(results)
+    if args.json:
+        with open(args.json, "w") as f:
+            json.dump(results, f, indent=2)
+    broken = [r["scenario"] for r in results if r.get("gzip_first_member_complete") is False]
+    for name in broken:
+        print(f"BROKEN {name}: gzip output does not decode in full from its first member")
+    found = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            found = regressions(results, json.load(f), args.tolerance)
+        for line in found:
+            print(f"REGRESSION {line}")
+    if broken or found: sys.exit(1)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,68 @@
+import json
+import os
+import time
+
+# --- Configuration ---
+CHECKPOINT_DIR = "checkpoints"
+CHECKPOINT_INTERVAL = 5.0  # Seconds between two checkpoint writes
+
+# --- Job Checkpoints ---
+class Checkpoint:
+    """JSON state of a running job, written atomically at most every CHECKPOINT_INTERVAL seconds.
+
+    When a RecordSink is bound, every save also syncs it and records how far its files
+    are valid, so resuming never duplicates or loses records.
+    """
+    def __init__(self, path, state=None, interval=CHECKPOINT_INTERVAL):
+        self.path = path
+        self.state = state if state is not None else {}
+        self.interval = interval
+        self.sink = None
+        self._last_save = 0.0
+
+    @classmethod
+    def for_job(cls, job_id, directory=CHECKPOINT_DIR):
+        os.makedirs(directory, exist_ok=True)
+        return cls(os.path.join(directory, f"job_{job_id}.json"))
+
+    @classmethod
+    def load(cls, path):
+        """Returns the checkpoint stored at path, or None if there is none."""
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return cls(path, json.load(f))
+        except (FileNotFoundError, json.JSONDecodeError):
+            return None
+
+    def bind(self, sink):
+        self.sink = sink
+
+    def maybe_save(self):
+        if time.time() - self._last_save >= self.interval:
+            self.save()
+
+    def save(self):
+        if self.sink is not None:
+            self.state["sink"] = self.sink.checkpoint()
+        tmp_path = self.path + ".tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.state, f)
+            f.flush()
+            os.fsync(f.fileno())
+        os.replace(tmp_path, self.path)
+        self._last_save = time.time()
+
+    def delete(self):
+        try: os.remove(self.path)
+        except FileNotFoundError: pass
+
+def list_checkpoints(directory=CHECKPOINT_DIR):
+    """Yields (job_id, checkpoint) for every job checkpoint on disk."""
+    if not os.path.isdir(directory): return
+    for filename in os.listdir(directory):
+        if not (filename.startswith("job_") and filename.endswith(".json")): continue
+        try: job_id = int(filename[len("job_"):-len(".json")])
+        except ValueError: continue
+        checkpoint = Checkpoint.load(os.path.join(directory, filename))
+        if checkpoint is not None:
+            yield job_id, checkpoint
@@ -0,0 +1,81 @@
+import gzip
+import os
+
+# Flask
+from flask import Response, send_file
+
+from record_sink import read_manifest
+
+# --- Configuration ---
+CHUNK_SIZE = 64 * 1024
+MIMETYPES = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson; charset=utf-8"}
+
+def stored_name(path):
+    """Download name of an output file: its name without the storage-only .gz suffix."""
+    name = os.path.basename(path)
+    return name[:-len(".gz")] if name.endswith(".gz") else name
+
+def output_format(path):
+    return stored_name(path).rsplit(".", 1)[-1]
+
+def decompressed_chunks(path, start, stop):
+    """Bytes start..stop of a gzip file's content, decompressed on the fly."""
+    with gzip.open(path, "rb") as f:
+        while start > 0:  # gzip cannot seek without decompressing; skip ahead in chunks
+            skipped = len(f.read(min(CHUNK_SIZE, start)))
+            if not skipped: return
+            start -= skipped
+            stop -= skipped
+        while stop > 0:
+            chunk = f.read(min(CHUNK_SIZE, stop))
+            if not chunk: return
+            stop -= len(chunk)
+            yield chunk
+
+# --- Download Responses ---
+def serve_output(path, request):
+    """Streams an output file, with ETag, conditional requests and byte ranges.
+
+    A single-member gzip file is sent as stored with Content-Encoding: gzip to clients that accept it
+    (decoders may stop after the first member). Other clients, and multi-member files published before
+    members were merged, get it decompressed on the fly, sized from its manifest. Ranges apply to the
+    representation sent.
+    """
+    manifest = read_manifest(path)
+    fmt = output_format(path)
+    mimetype = MIMETYPES.get(fmt, "application/octet-stream")
+    if not manifest or manifest.get("compression") != "gzip":
+        return send_file(path, mimetype=mimetype, as_attachment=True, download_name=stored_name(path),
+                         conditional=True, etag=manifest["sha256"] if manifest else True)
+
+    if request.accept_encodings.quality("gzip") > 0 and manifest.get("members") == 1:
+        response = send_file(path, mimetype=mimetype, as_attachment=True, download_name=stored_name(path),
+                             conditional=True, etag=f"{manifest['sha256']}-gzip")
+        response.headers["Content-Encoding"] = "gzip"
+        response.vary.add("Accept-Encoding")
+        return response
+
+    length = manifest["uncompressed_bytes"]
+    response = Response(mimetype=mimetype)
+    response.headers["Content-Disposition"] = f'attachment; filename="{stored_name(path)}"'
+    response.headers["Accept-Ranges"] = "bytes"
+    response.vary.add("Accept-Encoding")
+    response.set_etag(manifest["sha256"])
+    response.last_modified = os.path.getmtime(path)
+    response = response.make_conditional(request)
+    if response.status_code == 304: return response
+
+    start, stop = 0, length
+    byte_range = request.range
+    if byte_range is not None and request.if_range.etag in (None, manifest["sha256"]):
+        bounds = byte_range.range_for_length(length)
+        if bounds is None:
+            response = Response(status=416)
+            response.headers["Content-Range"] = f"bytes */{length}"
+            return response
+        start, stop = bounds
+        response.status_code = 206
+        response.content_range = f"bytes {start}-{stop - 1}/{length}"
+    response.response = decompressed_chunks(path, start, stop)
+    response.content_length = stop - start
+    return response
@@ -0,0 +1,265 @@
+import os
+import socket
+import threading
+import time
+from contextlib import contextmanager
+
+# Selenium
+from selenium import webdriver
+from selenium.common.exceptions import InvalidSessionIdException, NoSuchWindowException, WebDriverException
+from selenium.webdriver.chrome.options import Options as ChromeOptions
+from selenium.webdriver.chrome.service import Service as ChromeService
+from urllib3.exceptions import HTTPError as DriverConnectionError
+from webdriver_manager.chrome import ChromeDriverManager
+
+from profile_manager import profiles
+from resource_blocking import enable_performance_log
+
+# --- Configuration ---
+MAX_USES_PER_DRIVER = 20  # Recycle a browser after this many leases
+# WebDriver errors meaning the browser itself is gone, not that a page misbehaved
+LOST_DRIVER_MESSAGES = ("invalid session id", "no such window", "chrome not reachable", "disconnected",
+                        "session deleted", "target window already closed")
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+_chromedriver_path = None
+_chromedriver_lock = threading.Lock()
+
+# --- Helpers ---
+def driver_lost(error):
+    """True if error means the browser (or its chromedriver) died: retrying on it is pointless."""
+    if isinstance(error, (InvalidSessionIdException, NoSuchWindowException, DriverConnectionError, ConnectionError)):
+        return True
+    return isinstance(error, WebDriverException) and any(m in str(error).lower() for m in LOST_DRIVER_MESSAGES)
+
+def chromedriver_path():
+    """Resolves the chromedriver binary once per process instead of once per job."""
+    global _chromedriver_path
+    with _chromedriver_lock:
+        if _chromedriver_path is None:
+            _chromedriver_path = ChromeDriverManager().install()
+        return _chromedriver_path
+
+def allocate_port():
+    """Asks the OS for a free local TCP port."""
+    with socket.socket(socket.AF_INET, socket.SOCK_STREAM) as s:
+        s.bind(("127.0.0.1", 0))
+        return s.getsockname()[1]
+
+# --- Pool ---
+class PooledDriver:
+    def __init__(self, slot, driver, port, startup_time, profile=None):
+        self.slot = slot
+        self.driver = driver
+        self.port = port
+        self.profile = profile
+        self.startup_time = startup_time
+        self.uses = 0
+
+    @property
+    def debugger_address(self):
+        return f"127.0.0.1:{self.port}"
+
+class DriverPool:
+    def __init__(self, size=2, headless=True):
+        self.size = size
+        self.headless = headless
+        self._idle = []
+        self._leased = set()
+        self._starting = 0
+        self._cond = threading.Condition()
+        self._closed = False
+        self._stats = {
+            "leases": 0,
+            "lease_timeouts": 0,
+            "lease_wait_total": 0.0,
+            "lease_wait_max": 0.0,
+            "startups": 0,
+            "startup_failures": 0,
+            "startup_total": 0.0,
+            "startup_last": None,
+            "recycled": 0,
+        }
+
+    # --- Lifecycle ---
+    def start(self):
+        """Launches every slot in the background so the server starts immediately."""
+        for slot in range(self.size):
+            self._spawn(slot)
+
+    def close(self):
+        with self._cond:
+            self._closed = True
+            drivers = self._idle + list(self._leased)
+            self._idle = []
+            self._leased.clear()
+            self._cond.notify_all()
+        for pooled in drivers:
+            self._quit(pooled)
+
+    def _spawn(self, slot):
+        with self._cond:
+            self._starting += 1
+        threading.Thread(target=self._launch, args=(slot,), daemon=True).start()
+
+    def _launch(self, slot):
+        port = allocate_port()
+        started = time.time()
+        pooled = None
+        # Each slot runs on its own tmpfs clone of the golden (logged-in) profile
+        profile = profiles.clone(f"pool_slot{slot}")
+        try:
+            driver = self._create_driver(port, profile)
+            elapsed = time.time() - started
+            pooled = PooledDriver(slot, driver, port, elapsed, profile)
+            if not self._healthy(pooled):
+                raise RuntimeError("health check failed after launch")
+        except Exception as e:
+            print(f"[POOL] Slot {slot} failed to start: {e}")
+            if pooled: self._quit(pooled)
+            else: profiles.release(profile)
+            pooled = None
+
+        discard = False
+        with self._cond:
+            self._starting -= 1
+            if pooled is None:
+                self._stats["startup_failures"] += 1
+            elif self._closed:
+                discard = True
+            else:
+                self._stats["startups"] += 1
+                self._stats["startup_total"] += pooled.startup_time
+                self._stats["startup_last"] = round(pooled.startup_time, 3)
+                self._idle.append(pooled)
+            self._cond.notify_all()
+
+        if discard:
+            self._quit(pooled)
+
+    def _create_driver(self, port, profile_dir):
+        options = ChromeOptions()
+        options.add_argument(f"--user-data-dir={profile_dir}")
+        options.add_argument("--disable-blink-features=AutomationControlled")
+        options.add_argument("--disable-gpu")
+        options.add_argument("--no-sandbox")
+        options.add_argument("--disable-dev-shm-usage")
+        options.add_argument("--window-size=1280,1024")
+        options.add_argument("--log-level=3")
+        options.add_argument(f"--remote-debugging-port={port}")
+        options.add_argument(f"user-agent={USER_AGENT}")
+        if self.headless: options.add_argument("--headless=new")
+        enable_performance_log(options)
+
+        service = ChromeService(chromedriver_path())
+        return webdriver.Chrome(service=service, options=options)
+
+    def _healthy(self, pooled):
+        try:
+            pooled.driver.get("about:blank")
+            return pooled.driver.execute_script("return 1") == 1
+        except Exception:
+            return False
+
+    def _quit(self, pooled):
+        try: pooled.driver.quit()
+        except Exception: pass
+        profiles.release(pooled.profile)
+
+    # --- Leasing ---
+    def acquire(self, timeout=60):
+        """Blocks until a warm driver is idle. Returns None on timeout."""
+        started = time.time()
+        with self._cond:
+            while not self._idle:
+                remaining = timeout - (time.time() - started)
+                if self._closed or remaining <= 0:
+                    self._stats["lease_timeouts"] += 1
+                    return None
+                self._cond.wait(remaining)
+            pooled = self._idle.pop()
+            self._leased.add(pooled)
+            pooled.uses += 1
+
+            waited = time.time() - started
+            self._stats["leases"] += 1
+            self._stats["lease_wait_total"] += waited
+            self._stats["lease_wait_max"] = max(self._stats["lease_wait_max"], waited)
+            return pooled
+
+    def release(self, pooled):
+        """Returns a driver to the pool, recycling it when it is unhealthy or worn out."""
+        with self._cond:
+            self._leased.discard(pooled)
+            if self._closed:
+                recycle = None
+            else:
+                recycle = pooled.uses >= MAX_USES_PER_DRIVER
+
+        if recycle is None:
+            self._quit(pooled)
+            return
+
+        if not recycle and self._healthy(pooled):
+            with self._cond:
+                self._idle.append(pooled)
+                self._cond.notify_all()
+            return
+
+        self._quit(pooled)
+        with self._cond:
+            self._stats["recycled"] += 1
+        self._spawn(pooled.slot)
+
+    @contextmanager
+    def lease(self, timeout=60):
+        pooled = self.acquire(timeout)
+        try:
+            yield pooled
+        finally:
+            if pooled is not None:
+                self.release(pooled)
+
+    # --- Stats ---
+    def stats(self):
+        with self._cond:
+            s = dict(self._stats)
+            startups = s.pop("startup_total")
+            wait_total = s.pop("lease_wait_total")
+            s.update({
+                "size": self.size,
+                "headless": self.headless,
+                "idle": len(self._idle),
+                "leased": len(self._leased),
+                "starting": self._starting,
+                "startup_avg": round(startups / s["startups"], 3) if s["startups"] else None,
+                "lease_wait_avg": round(wait_total / s["leases"], 3) if s["leases"] else None,
+                "lease_wait_max": round(s["lease_wait_max"], 3),
+            })
+            return s
+
+# --- Process Accounting ---
+BROWSER_PROCESS_NAMES = ("chrome", "chromium", "chromium-browse", "headless_shell", "google-chrome")
+
+def browser_process_count(root_pid=None):
+    """Live browser instances started by this process: Chrome processes whose parent is not Chrome (Linux /proc)."""
+    root_pid = root_pid or os.getpid()
+    names, parents = {}, {}
+    try: pids = [int(p) for p in os.listdir("/proc") if p.isdigit()]
+    except OSError: return 0
+    for pid in pids:
+        try:
+            with open(f"/proc/{pid}/stat") as f:
+                head, tail = f.read().rsplit(")", 1)
+            names[pid] = head.split("(", 1)[1]
+            parents[pid] = int(tail.split()[1])
+        except (OSError, IndexError, ValueError):
+            continue
+    count = 0
+    for pid, name in names.items():
+        if name not in BROWSER_PROCESS_NAMES or names.get(parents[pid]) in BROWSER_PROCESS_NAMES: continue
+        ancestor = parents[pid]
+        while ancestor and ancestor != root_pid:
+            ancestor = parents.get(ancestor)
+        if ancestor == root_pid: count += 1
+    return count
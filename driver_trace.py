@@ -0,0 +1,122 @@
+import json
+import os
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Configuration ---
+TRACE_DIR = "traces"
+MAX_EVENTS = 100_000  # Commands kept for the Chrome trace export; the summary counts all of them
+TOP_CALL_SITES = 25   # Call sites listed in a summary, by total time
+
+# Frames skipped when looking for a command's call site: selenium itself, this module, and the
+# readiness helpers, whose polling is charged to the scraper line that called wait_for()
+_SKIPPED_FILES = ("driver_trace.py", "readiness.py", "contextlib.py")
+
+def call_site():
+    """'file.py:line function' of the innermost frame outside selenium and the skipped helpers."""
+    frame = sys._getframe(2)
+    while frame:
+        path = frame.f_code.co_filename
+        name = os.path.basename(path)
+        if f"{os.sep}selenium{os.sep}" not in path and name not in _SKIPPED_FILES:
+            return f"{name}:{frame.f_lineno} {frame.f_code.co_name}"
+        frame = frame.f_back
+    return "unknown"
+
+def payload_size(value):
+    if value is None: return 0
+    try: return len(json.dumps(value, default=str))
+    except (TypeError, ValueError): return 0
+
+# --- Driver Trace ---
+class DriverTrace:
+    """Every WebDriver command of a job with its call site, duration and payload size. Shared by every worker thread.
+
+    attach() wraps driver.execute, the single path to chromedriver: element calls (find_element, .text,
+    get_attribute, click) go through their driver's execute as well.
+    """
+    def __init__(self, keep_events=False):
+        self.keep_events = keep_events
+        self._lock = threading.Lock()
+        self._commands = {}
+        self._sites = {}
+        self._events = []
+        self._dropped = 0
+
+    def attach(self, driver):
+        if driver is None or "execute" in driver.__dict__: return
+        original = driver.execute
+        def execute(command, params=None):
+            site = call_site()
+            started = time.time()
+            ok = False
+            response = None
+            try:
+                response = original(command, params)
+                ok = True
+                return response
+            finally:
+                self.record(command, site, started, time.time() - started,
+                            payload_size(params) + payload_size(response and response.get("value")), ok)
+        execute.trace = self
+        driver.execute = execute
+
+    def detach(self, driver):
+        if driver is not None and getattr(driver.__dict__.get("execute"), "trace", None) is self:
+            del driver.execute
+
+    def record(self, command, site, started, duration, size, ok=True):
+        with self._lock:
+            for key, table in ((command, self._commands), (site, self._sites)):
+                s = table.setdefault(key, {"count": 0, "total": 0.0, "bytes": 0, "errors": 0})
+                s["count"] += 1
+                s["total"] += duration
+                s["bytes"] += size
+                if not ok: s["errors"] += 1
+            if not self.keep_events: return
+            if len(self._events) >= MAX_EVENTS:
+                self._dropped += 1
+                return
+            self._events.append((command, site, started, duration, size, ok, threading.get_ident()))
+
+    def summary(self, top=TOP_CALL_SITES):
+        def rows(table):
+            return {key: {"count": s["count"], "total": round(s["total"], 3), "bytes": s["bytes"], "errors": s["errors"]}
+                    for key, s in sorted(table.items(), key=lambda item: -item[1]["total"])}
+        with self._lock:
+            commands, sites = rows(self._commands), rows(self._sites)
+        return {
+            "commands": sum(s["count"] for s in commands.values()),
+            "total": round(sum(s["total"] for s in commands.values()), 3),
+            "bytes": sum(s["bytes"] for s in commands.values()),
+            "by_command": commands,
+            "by_call_site": dict(list(sites.items())[:top]),
+        }
+
+    def export(self, path):
+        """Writes the kept commands as Chrome trace JSON (chrome://tracing, Perfetto), one row per thread."""
+        with self._lock:
+            events, dropped = list(self._events), self._dropped
+        pid = os.getpid()
+        trace = [{"name": command, "cat": "webdriver", "ph": "X", "pid": pid, "tid": tid,
+                  "ts": int(started * 1e6), "dur": int(duration * 1e6),
+                  "args": {"site": site, "bytes": size, "ok": ok}}
+                 for command, site, started, duration, size, ok, tid in events]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        tmp = f"{path}.tmp"
+        with open(tmp, "w") as f:
+            json.dump({"traceEvents": trace, "displayTimeUnit": "ms", "otherData": {"dropped": dropped}}, f)
+        os.replace(tmp, path)
+        return path
+
+@contextmanager
+def traced(driver, trace):
+    """Traces a driver's commands for the duration of the block; a no-op without a trace or driver."""
+    if trace is None:
+        yield driver
+        return
+    trace.attach(driver)
+    try: yield driver
+    finally: trace.detach(driver)
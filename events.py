@@ -0,0 +1,64 @@
+import json
+import queue
+import threading
+
+# --- Configuration ---
+SUBSCRIBER_QUEUE_SIZE = 256  # A client this far behind is disconnected and resyncs on reconnect
+KEEPALIVE_SECONDS = 15
+
+# --- Server-Sent Events Broker ---
+class EventBroker:
+    """Fans published events out to every connected SSE client. Each event is formatted once and shared."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscribers = set()
+
+    def subscribe(self):
+        q = queue.Queue(maxsize=SUBSCRIBER_QUEUE_SIZE)
+        with self._lock:
+            self._subscribers.add(q)
+        return q
+
+    def unsubscribe(self, q):
+        with self._lock:
+            self._subscribers.discard(q)
+
+    @property
+    def subscriber_count(self):
+        with self._lock:
+            return len(self._subscribers)
+
+    def publish(self, event, data):
+        message = format_sse(event, data)
+        with self._lock:
+            subscribers = list(self._subscribers)
+        for q in subscribers:
+            try:
+                q.put_nowait(message)
+            except queue.Full:
+                # Slow client: drop it rather than buffer without bound
+                self.unsubscribe(q)
+                try: q.get_nowait()
+                except queue.Empty: pass
+                try: q.put_nowait(None)
+                except queue.Full: pass
+
+    def stream(self, q):
+        """Generator of SSE chunks for one client. Ends when the client is dropped."""
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = q.get(timeout=KEEPALIVE_SECONDS)
+                except queue.Empty:
+                    yield ": keep-alive\n\n"
+                    continue
+                if message is None: return
+                yield message
+        finally:
+            self.unsubscribe(q)
+
+def format_sse(event, data):
+    # Strings are taken as already serialized JSON
+    payload = data if isinstance(data, str) else json.dumps(data)
+    return f"event: {event}\ndata: {payload}\n\n"
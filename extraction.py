@@ -0,0 +1,88 @@
+import json
+
+# --- Single Round-Trip Field Extraction ---
+# A field spec is one of:
+#   "css, css"                      -> like find_element: first match in document order
+#   ["css", "css"]                  -> ordered fallbacks, first selector that matches wins
+#   {"css": ..., "xpath": ..., "strip": "...", "attr": "..."}
+#       xpath is tried after css, strip removes a label, attr reads an attribute instead of text
+
+_EXTRACTOR_JS = """
+var specs = %s;
+var root = arguments[0] || document;
+
+function clean(text) {
+    if (text === null || text === undefined) return null;
+    text = String(text).replace(/\\s+/g, ' ').trim();
+    return text || null;
+}
+
+function find(spec) {
+    for (var i = 0; i < spec.css.length; i++) {
+        var el = root.querySelector(spec.css[i]);
+        if (el) return el;
+    }
+    for (var j = 0; j < spec.xpath.length; j++) {
+        var hit = document.evaluate(spec.xpath[j], root, null, XPathResult.FIRST_ORDERED_NODE_TYPE, null);
+        if (hit.singleNodeValue) return hit.singleNodeValue;
+    }
+    return null;
+}
+
+var out = {};
+for (var name in specs) {
+    var spec = specs[name];
+    var el = find(spec);
+    var value = null;
+    if (el) {
+        if (spec.attr) value = (spec.attr in el) ? el[spec.attr] : el.getAttribute(spec.attr);
+        else value = el.innerText !== undefined ? el.innerText : el.textContent;
+    }
+    if (value && spec.strip) value = String(value).split(spec.strip).join('');
+    out[name] = clean(value);
+}
+return out;
+"""
+
+_ATTRIBUTE_LIST_JS = """
+var els = arguments[2] ? arguments[2] : document.querySelectorAll(arguments[0]);
+var attr = arguments[1];
+return Array.prototype.map.call(els, function (el) {
+    return (attr in el) ? el[attr] : el.getAttribute(attr);
+});
+"""
+
+_compiled = {}
+
+def _as_list(value):
+    if not value: return []
+    return [value] if isinstance(value, str) else list(value)
+
+def _normalize(spec):
+    if isinstance(spec, dict):
+        return {
+            "css": _as_list(spec.get("css")),
+            "xpath": _as_list(spec.get("xpath")),
+            "strip": spec.get("strip"),
+            "attr": spec.get("attr"),
+        }
+    return {"css": _as_list(spec), "xpath": [], "strip": None, "attr": None}
+
+def compile_extractor(fields):
+    """Turns a {name: spec} map into one script. Compiled scripts are cached per map."""
+    key = json.dumps(fields, sort_keys=True)
+    script = _compiled.get(key)
+    if script is None:
+        specs = {name: _normalize(spec) for name, spec in fields.items()}
+        script = _EXTRACTOR_JS % json.dumps(specs)
+        _compiled[key] = script
+    return script
+
+def extract_fields(driver, fields, root=None):
+    """Reads every field with one execute_script call. Values are whitespace-normalized, missing ones are None."""
+    result = driver.execute_script(compile_extractor(fields), root) or {}
+    return {name: result.get(name) for name in fields}
+
+def extract_attribute_list(driver, selector, attr, elements=None):
+    """Reads one attribute (or DOM property) from every match in a single call."""
+    return driver.execute_script(_ATTRIBUTE_LIST_JS, selector, attr, elements) or []
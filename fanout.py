@@ -0,0 +1,150 @@
+import queue
+import re
+import threading
+from contextlib import contextmanager
+from dataclasses import replace
+
+import linkedin_scraper
+import rubyonremote_scraper
+from progress import ProgressReporter, describe_error
+
+# --- Configuration ---
+PLATFORMS = {
+    "linkedin": linkedin_scraper,
+    "rubyonremote": rubyonremote_scraper,
+}
+QUEUE_SIZE = 100     # Records buffered between the scraper threads and the consumer
+PUT_TIMEOUT = 0.5    # Seconds between checks for a stopped consumer while the buffer is full
+RESUMABLE = False    # Scrapers' resume state is kept per run in memory; a failed run starts over
+
+# Unified schema of multi-platform outputs
+FIELDNAMES = ["platform", "posting_id", "title", "company", "location", "posted_date", "salary_info",
+              "url", "company_link", "description"]
+
+# Trailing words dropped from company names before comparing them
+LEGAL_SUFFIXES = {"inc", "llc", "ltd", "limited", "gmbh", "ag", "co", "corp", "corporation", "plc", "sa", "bv", "kk"}
+
+def unify(platform, record):
+    """Maps a scraper's record onto FIELDNAMES."""
+    if platform == "linkedin":
+        job_id = record.get("linkedin_job_id")
+        return {
+            "platform": platform,
+            "posting_id": job_id,
+            "title": record.get("title"),
+            "company": record.get("company_name"),
+            "location": record.get("job_location"),
+            "posted_date": record.get("posted_date"),
+            "salary_info": record.get("salary_info"),
+            "url": f"{linkedin_scraper.BASE_URL}/jobs/view/{job_id}/" if job_id else None,
+            "company_link": record.get("company_link"),
+            "description": record.get("description"),
+        }
+    return {
+        "platform": platform,
+        "posting_id": record.get("rubyonremote_job_id"),
+        "title": record.get("title"),
+        "company": record.get("company"),
+        "location": None,
+        "posted_date": record.get("date"),
+        "salary_info": None,
+        "url": record.get("url"),
+        "company_link": None,
+        "description": record.get("description"),
+    }
+
+def normalize(text):
+    return " ".join(re.sub(r"[^\w]+", " ", (text or "").lower()).split())
+
+def dedupe_key(record):
+    """Normalized (company, title), or None when either is missing (such records are never merged)."""
+    company = normalize(record.get("company")).split()
+    while company and company[-1] in LEGAL_SUFFIXES:
+        company.pop()
+    title = normalize(record.get("title"))
+    if not company or not title: return None
+    return " ".join(company), title
+
+# --- Fan-Out ---
+def platform_config(config, platform):
+    """The config one platform's scraper runs with: its own progress tag, resume state and DevTools port."""
+    def tagged(event):
+        config.progress.handler(dict(event, platform=platform))
+    return replace(
+        config,
+        progress=ProgressReporter(tagged if config.progress.handler else None),
+        log=lambda line: config.log(f"[{platform}] {line}"),
+        driver=config.driver if platform == "linkedin" else None,  # The leased browser keeps LinkedIn's login
+        debugging_port=config.debugging_port if platform == "linkedin" else None,
+        checkpoint=None,
+        _transient_state={},
+    )
+
+@contextmanager
+def main_driver(config, platform):
+    """RubyOnRemote's browser comes from the lease factory if it has one to spare; otherwise the scraper launches its own."""
+    if config.driver is not None or config.lease_driver is None or (platform == "rubyonremote" and config.engine == "http"):
+        yield config.driver
+        return
+    with config.lease_driver() as driver:
+        yield driver
+
+def put(results, item, stop):
+    while not stop.is_set():
+        try:
+            results.put(item, timeout=PUT_TIMEOUT)
+            return True
+        except queue.Full:
+            continue
+    return False
+
+def run_platform(platform, config, results, stop):
+    sub = platform_config(config, platform)
+    try:
+        with main_driver(sub, platform) as driver:
+            sub.driver = driver
+            records = PLATFORMS[platform].scrape(sub)
+            try:
+                for record in records:
+                    if not put(results, (platform, unify(platform, record)), stop): break
+            finally:
+                records.close()
+        sub.progress.emit("platform_done", status="completed")
+        put(results, (platform, None), stop)
+    except Exception as e:
+        sub.log(f"Failed: {e}")
+        sub.progress.emit("platform_done", status="error", error=describe_error(e))
+        put(results, (platform, e), stop)
+
+def scrape(config):
+    """Runs every platform's scraper concurrently and yields unified records as they arrive, without duplicates.
+
+    A failing platform does not stop the others; only when all of them fail is the first error raised.
+    """
+    results = queue.Queue(maxsize=QUEUE_SIZE)
+    stop = threading.Event()
+    threads = [threading.Thread(target=run_platform, args=(platform, config, results, stop), daemon=True)
+               for platform in PLATFORMS]
+    for t in threads: t.start()
+
+    seen = set()
+    errors = []
+    running = len(threads)
+    try:
+        while running:
+            platform, item = results.get()
+            if item is None or isinstance(item, Exception):
+                running -= 1
+                if item is not None: errors.append(item)
+                continue
+            key = dedupe_key(item)
+            if key in seen:
+                config.progress.emit("duplicate", platform=platform, title=item["title"])
+                continue
+            if key: seen.add(key)
+            yield item
+    finally:
+        stop.set()
+        for t in threads: t.join()
+    if len(errors) == len(threads):
+        raise errors[0]
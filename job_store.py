@@ -0,0 +1,250 @@
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict, namedtuple
+
+# --- Configuration ---
+JOB_DB_PATH = "scraper_jobs.db"
+HOT_JOBS = 200          # Finished jobs kept in memory (queued and running jobs are always kept)
+ACTIVE = ("queued", "running")
+FLUSH_INTERVAL = 2.0    # Seconds between writes of a running job's progress
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS jobs (
+    id INTEGER PRIMARY KEY,
+    status TEXT NOT NULL,
+    platform TEXT,
+    started_at TEXT,
+    version INTEGER NOT NULL DEFAULT 0,
+    data TEXT NOT NULL
+);
+CREATE INDEX IF NOT EXISTS idx_jobs_version ON jobs(version);
+CREATE INDEX IF NOT EXISTS idx_jobs_status ON jobs(status);
+CREATE INDEX IF NOT EXISTS idx_jobs_platform ON jobs(platform);
+CREATE INDEX IF NOT EXISTS idx_jobs_started_at ON jobs(started_at);
+"""
+
+# Immutable view of a job (or a page of history) at one version, serialized once and shared
+Snapshot = namedtuple("Snapshot", "version json")
+
+# --- Job Record ---
+class JobRecord:
+    """Compact job state: common fields live in slots, rare ones in a small dict. Reads like a dict."""
+    FIELDS = ("version", "status", "progress", "platform", "engine", "job_keywords", "job_location",
+              "file_id", "timestamp", "started_at", "jobs_found", "jobs_processed", "results_count",
+              "output_file", "error")
+    __slots__ = ("job_id",) + FIELDS + ("extra", "dirty", "flushed_at", "cached")
+
+    def __init__(self, job_id, fields=None):
+        self.job_id = job_id
+        for name in self.FIELDS:
+            setattr(self, name, None)
+        self.extra = None
+        self.dirty = True
+        self.flushed_at = 0.0
+        self.cached = None
+        if fields: self.update(fields)
+
+    def __getitem__(self, key):
+        value = self.get(key, KeyError)
+        if value is KeyError: raise KeyError(key)
+        return value
+
+    def __setitem__(self, key, value):
+        if key in self.FIELDS:
+            setattr(self, key, value)
+        else:
+            if self.extra is None: self.extra = {}
+            self.extra[key] = value
+        self.dirty = True
+
+    def get(self, key, default=None):
+        if key in self.FIELDS:
+            value = getattr(self, key)
+            return default if value is None else value
+        return self.extra.get(key, default) if self.extra else default
+
+    def setdefault(self, key, default=None):
+        value = self.get(key, KeyError)
+        if value is KeyError:
+            self[key] = value = default
+        return value
+
+    def pop(self, key, default=None):
+        value = self.get(key, default)
+        if key in self.FIELDS: setattr(self, key, None)
+        elif self.extra: self.extra.pop(key, None)
+        self.dirty = True
+        return value
+
+    def update(self, fields=None, **more):
+        for key, value in dict(fields or {}, **more).items():
+            self[key] = value
+
+    def to_dict(self):
+        data = {name: getattr(self, name) for name in self.FIELDS if getattr(self, name) is not None}
+        if self.extra: data.update(self.extra)
+        data['job_id'] = self.job_id
+        return data
+
+    def snapshot(self):
+        if self.cached is None or self.cached.version != self.version:
+            self.cached = Snapshot(self.version, json.dumps(self.to_dict()))
+        return self.cached
+
+# --- Store ---
+class JobStore:
+    """SQLite-backed job history with a bounded LRU of hot jobs in memory.
+
+    Every change bumps a store-wide version; a job carries the version of its last change, so
+    the store version doubles as the version of the history list.
+    """
+    def __init__(self, path=JOB_DB_PATH, hot_size=HOT_JOBS):
+        self.hot_size = hot_size
+        self._lock = threading.RLock()
+        self._changed = threading.Condition(self._lock)
+        self._hot = OrderedDict()
+        self._pages = {}  # (limit, offset, status, platform) -> Snapshot of a history page
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        columns = [row[1] for row in self._conn.execute("PRAGMA table_info(jobs)")]
+        if columns and "version" not in columns:
+            # Databases from before versioning: rows now hold the full snapshot, job_id included
+            self._conn.execute("ALTER TABLE jobs ADD COLUMN version INTEGER NOT NULL DEFAULT 0")
+            self._conn.execute("UPDATE jobs SET data = json_set(data, '$.job_id', id)")
+        self._conn.executescript(SCHEMA)
+        row = self._conn.execute("SELECT MAX(id), MAX(version) FROM jobs").fetchone()
+        self._counter = row[0] or 0
+        self.version = row[1] or 0
+
+    @property
+    def lock(self):
+        return self._lock
+
+    def wait(self, predicate, timeout):
+        """Blocks until predicate() holds (re-checked after every change) or timeout passes."""
+        with self._changed:
+            return self._changed.wait_for(predicate, timeout)
+
+    # --- Reads ---
+    def get(self, job_id):
+        with self._lock:
+            record = self._hot.get(job_id)
+            if record is not None:
+                self._hot.move_to_end(job_id)
+                return record
+            row = self._conn.execute("SELECT data FROM jobs WHERE id = ?", (job_id,)).fetchone()
+            if row is None: return None
+            fields = json.loads(row[0])
+            fields.pop('job_id', None)
+            record = JobRecord(job_id, fields)
+            record.dirty = False
+            self._remember(record)
+            return record
+
+    def read(self, job_id):
+        """A private copy of the job's fields, or None."""
+        with self._lock:
+            record = self.get(job_id)
+            return record.to_dict() if record else None
+
+    def snapshot(self, job_id):
+        with self._lock:
+            record = self.get(job_id)
+            return record.snapshot() if record else None
+
+    def list(self, limit=50, offset=0, status=None, platform=None):
+        """Snapshot of one history page, newest first. Pages are cached until the next change."""
+        key = (limit, offset, status, platform)
+        with self._lock:
+            page = self._pages.get(key)
+            if page is not None and page.version == self.version: return page
+            jobs = ",".join(self._page(limit, offset, status, platform))
+            page = Snapshot(self.version, f'{{"jobs": [{jobs}], "limit": {limit}, "offset": {offset}, "version": {self.version}}}')
+            self._pages = {k: v for k, v in self._pages.items() if v.version == self.version}
+            self._pages[key] = page
+            return page
+
+    def _page(self, limit, offset, status, platform):
+        # Hot copies win over stored rows since they may be ahead of the database
+        where, args = [], []
+        if status:
+            where.append("status = ?")
+            args.append(status)
+        if platform:
+            where.append("platform = ?")
+            args.append(platform)
+        sql = "SELECT id, data FROM jobs"
+        if where: sql += " WHERE " + " AND ".join(where)
+        sql += " ORDER BY id DESC LIMIT ? OFFSET ?"
+        for job_id, data in self._conn.execute(sql, args + [limit, offset]).fetchall():
+            record = self._hot.get(job_id)
+            yield record.snapshot().json if record is not None else data
+
+    def by_status(self, status):
+        with self._lock:
+            rows = self._conn.execute("SELECT id FROM jobs WHERE status = ?", (status,)).fetchall()
+            return [self.get(job_id) for (job_id,) in rows]
+
+    # --- Writes ---
+    def create(self, fields, job_id=None):
+        """Inserts a job. A new id is allocated unless one is given (restoring a job)."""
+        with self._lock:
+            if job_id is None:
+                self._counter += 1
+                job_id = self._counter
+            else:
+                self._counter = max(self._counter, job_id)
+            record = JobRecord(job_id, {k: v for k, v in fields.items() if k != 'job_id'})
+            self._bump(record)
+            self._remember(record)
+            self._flush(record)
+            return record
+
+    def modify(self, job_id, change):
+        """Applies change(record) and returns the new Snapshot. Running jobs are written at most every FLUSH_INTERVAL."""
+        with self._lock:
+            record = self.get(job_id)
+            if record is None: raise KeyError(job_id)
+            status = record.status
+            change(record)
+            self._bump(record)
+            if record.status != status or record.status != 'running' or time.time() - record.flushed_at >= FLUSH_INTERVAL:
+                self._flush(record)
+            return record.snapshot()
+
+    def _bump(self, record):
+        self.version += 1
+        record.version = self.version
+        record.dirty = True
+        self._changed.notify_all()
+
+    def flush_all(self):
+        with self._lock:
+            for record in self._hot.values():
+                if record.dirty: self._flush(record)
+
+    def _flush(self, record):
+        self._conn.execute(
+            "INSERT INTO jobs (id, status, platform, started_at, version, data) VALUES (?, ?, ?, ?, ?, ?) "
+            "ON CONFLICT(id) DO UPDATE SET status = excluded.status, platform = excluded.platform, "
+            "started_at = excluded.started_at, version = excluded.version, data = excluded.data",
+            (record.job_id, record.status or 'unknown', record.platform, record.started_at,
+             record.version, record.snapshot().json),
+        )
+        record.dirty = False
+        record.flushed_at = time.time()
+
+    def _remember(self, record):
+        self._hot[record.job_id] = record
+        self._hot.move_to_end(record.job_id)
+        # Evict least recently used finished jobs; active ones stay pinned
+        if len(self._hot) <= self.hot_size: return
+        for job_id in list(self._hot):
+            if len(self._hot) <= self.hot_size: break
+            old = self._hot[job_id]
+            if old.status in ACTIVE or old is record: continue
+            if old.dirty: self._flush(old)
+            del self._hot[job_id]
@@ -1,10 +1,7 @@
-import time
 import random
 import json
-import csv
 import os
 import platform
-import sys
 from urllib.parse import quote_plus
 
 # Selenium
@@ -16,29 +13,48 @@ from selenium.webdriver.chrome.options import Options as ChromeOptions
 from selenium.webdriver.chrome.service import Service as ChromeService
 from webdriver_manager.chrome import ChromeDriverManager
 
+from driver_pool import allocate_port, driver_lost
+from profile_manager import profiles
+from extraction import extract_attribute_list, extract_fields
+from progress import ProgressReporter, describe_error
+from resource_blocking import enable_performance_log, setup_blocking
+from readiness import any_of, count_above, element_clickable, element_present, element_stale, text_changed, wait_for
+from record_sink import RecordSink
+from scrape_config import ScrapeConfig
+from seen_index import SeenIndex, query_key
+
 # --- Configuration ---
 JOB_KEYWORDS = "Ruby on Rails"
 JOB_LOCATION = "Japan"
 JOB_WORKPLACE_TYPE = "remote"
 MAX_PAGES_TO_SCRAPE = 1
+INCREMENTAL = False  # Only open cards newer than those of earlier runs of the same search
+RESULTS_PER_PAGE = 25  # LinkedIn's page size, used for the &start= offset when resuming
+BASE_URL = "https://www.linkedin.com"
 HEADLESS = False  
 
 # --- Selectors ---
+COMPANY_ANCHOR = "div.job-details-jobs-unified-top-card__company-name a, a.uxvNeZlUzUerxhncQCbPGgMBxUNKqUMfQTIcuo"
 SELECTORS = {
     "job_card_list": "div[data-job-id].job-card-container, li.jobs-search-results__list-item",
     "detail_pane": {
         "title": "h1.t-24.t-bold, h2.t-16.t-black.t-bold, div.job-details-jobs-unified-top-card__job-title h1",
-        "company_link": "div.job-details-jobs-unified-top-card__company-name a, a.uxvNeZlUzUerxhncQCbPGgMBxUNKqUMfQTIcuo",
+        "company_name": COMPANY_ANCHOR,
+        "company_link": {"css": COMPANY_ANCHOR, "attr": "href"},
         "job_location": "span.tvm__text.tvm__text--low-emphasis, div.job-details-jobs-unified-top-card__tertiary-description-container span",
         "posted_date": "span.tvm__text--low-emphasis, div.job-details-jobs-unified-top-card__tertiary-description-container span",
         "description": "div.jobs-box__html-content, div.jobs-description-content__text--stretch, div.jobs-description__content, #job-details"
-    }
+    },
+    # Anything in the detail pane's top card that carries a given job's id ({job_id})
+    "detail_pane_job": "[class*='top-card'] a[href*='/jobs/view/{job_id}/'], [class*='top-card'] [data-job-id='{job_id}']"
 }
 
+FIELDNAMES = ['linkedin_job_id', 'company_link', 'title', 'company_name', 'job_location', 'posted_date', 'salary_info', 'description']
+
 # --- Browser Setup ---
-def setup_driver():
-    current_dir = os.getcwd()
-    local_profile_path = os.path.join(current_dir, "chrome_profile")
+def setup_driver(headless=HEADLESS, debugging_port=None, profile_path=None):
+    # Normally a throwaway clone of the logged-in profile (see profile_manager.py)
+    local_profile_path = profile_path or profiles.source
     
     options = ChromeOptions()
     options.add_argument(f"--user-data-dir={local_profile_path}")
@@ -48,23 +64,25 @@ def setup_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1280,1024")
     options.add_argument("--log-level=3")
-    options.add_argument("--remote-debugging-port=9222")
+    # A port of its own, so concurrent jobs do not collide on the DevTools endpoint
+    options.add_argument(f"--remote-debugging-port={debugging_port or allocate_port()}")
     options.add_argument("user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36")
 
-    if HEADLESS and os.path.exists(local_profile_path):
+    # Without a saved login the browser stays visible so the user can sign in
+    if headless and os.path.exists(profiles.source):
         options.add_argument("--headless=new")
+    enable_performance_log(options)
 
     try:
         service = ChromeService(ChromeDriverManager().install())
         driver = webdriver.Chrome(service=service, options=options)
         return driver
     except Exception as e:
-        print(f"FATAL ERROR: {e}")
-        sys.exit(1)
+        raise RuntimeError(f"Could not start Chrome: {e}")
 
 # --- Scroll Logic (The Fix) ---
-def load_full_job_list(driver):
-    print("   -> Loading jobs (Dynamic JS Scroll)...")
+def load_full_job_list(driver, log=print, wait_stats=None, progress=None):
+    log("   -> Loading jobs (Dynamic JS Scroll)...")
     
     # 1. Zoom out to fit more items (Triggers lazy load easier)
     try:
@@ -79,7 +97,8 @@ def load_full_job_list(driver):
         # 2. Get current cards
         cards = driver.find_elements(By.CSS_SELECTOR, SELECTORS["job_card_list"])
         count = len(cards)
-        print(f"      Loaded {count} jobs...")
+        log(f"      Loaded {count} jobs...")
+        if progress: progress.emit("list_loaded", count=count)
 
         if count >= 25 or (count == last_count and retries >= max_retries):
             # Reset zoom before exiting
@@ -118,100 +137,217 @@ def load_full_job_list(driver):
                 targets.forEach(t => t.scrollTop = t.scrollHeight);
             """)
 
-        time.sleep(3) # Wait for network
+        # Wait for the lazy loader to append more cards (retries cover the "no more cards" case)
+        wait_for(driver, count_above(SELECTORS["job_card_list"], count), 3, "list_scroll", wait_stats)
 
 # --- Main Logic ---
 def clean_text(text):
     if not text: return None
     return " ".join(text.split())
 
-def main():
-    driver = setup_driver()
+def build_search_url(config):
+    WORKPLACE_FILTER_CODES = {"on-site": "1", "remote": "2", "hybrid": "3"}
+    base = f"{config.base_url or BASE_URL}/jobs/search/"
+    url = f"{base}?keywords={quote_plus(config.job_keywords)}&location={quote_plus(config.job_location)}"
+    if config.workplace_type in WORKPLACE_FILTER_CODES:
+        url += f"&f_WT={WORKPLACE_FILTER_CODES[config.workplace_type]}"
+    if config.incremental:
+        url += "&sortBy=DD"  # Most recent first, so the high-water mark is where new postings end
+    return url
+
+def mark_key(config):
+    return query_key("linkedin", config.job_keywords, config.job_location, config.workplace_type)
+
+def scrape(config):
+    """Yields one record per captured job. Quits the browser only if it launched it."""
+    log = config.log
+    progress = config.progress
+    owns_driver = config.driver is None
+    if owns_driver:
+        profile_path = profiles.clone("linkedin")
+        try:
+            with progress.phase("driver_startup"):
+                driver = setup_driver(config.headless, config.debugging_port, profile_path)
+        except Exception:
+            profiles.release(profile_path)
+            raise
+    else:
+        driver = config.driver
+    if config.driver_trace: config.driver_trace.attach(driver)
+    config.use_driver(driver)
     try:
+        setup_blocking(driver, config.blocklist(), log)
+
         # Check Login
-        driver.get("https://www.linkedin.com/feed/")
-        if "login" in driver.current_url:
-            print("❌ Not logged in. Please run without headless mode once to login.")
-            driver.quit()
-            return
-
-        # Build URL
-        WORKPLACE_FILTER_CODES = {"on-site": "1", "remote": "2", "hybrid": "3"}
-        base = "https://www.linkedin.com/jobs/search/"
-        url = f"{base}?keywords={quote_plus(JOB_KEYWORDS)}&location={quote_plus(JOB_LOCATION)}"
-        if JOB_WORKPLACE_TYPE in WORKPLACE_FILTER_CODES:
-            url += f"&f_WT={WORKPLACE_FILTER_CODES[JOB_WORKPLACE_TYPE]}"
-
-        driver.get(url)
-        all_data = []
-        processed = set()
-
-        for page in range(1, MAX_PAGES_TO_SCRAPE + 1):
-            print(f"--- Scraping Page {page} ---")
+        with progress.phase("login_check"):
+            driver.get(f"{config.base_url or BASE_URL}/feed/")
+            if "login" in driver.current_url:
+                raise RuntimeError("Not logged in. Please run without headless mode once to login.")
+
+        # Resume state: current page and ids already handled (kept in the job checkpoint)
+        state = config.checkpoint_state()
+        state.setdefault("page", 1)
+        done = state.setdefault("processed", [])
+        processed = set(done)
+        start_page = state["page"]
+        total_found = 0
+        captured = 0
+        pane_title = None  # Title the detail pane shows, to tell when the next click has re-rendered it
+        seen = config.seen_index
+        fail = getattr(seen, "fail", None)  # Batch registry only: frees a posting it handed to this run
+        mark = seen.high_water(mark_key(config)) if config.incremental and seen else None
+
+        search_url = build_search_url(config)
+        if start_page > 1:
+            log(f"   Resuming at page {start_page} ({len(processed)} jobs already done)...")
+            search_url += f"&start={(start_page - 1) * RESULTS_PER_PAGE}"
+        with progress.phase("search_load"):
+            driver.get(search_url)
+            wait_for(driver, element_present(SELECTORS["job_card_list"]), 15, "search_results", config.wait_stats)
+
+        for page in range(start_page, config.max_pages + 1):
+            config.check_deadline()
+            log(f"--- Scraping Page {page} ---")
+            progress.emit("page", page=page)
             
             # Use the new robust loader
-            load_full_job_list(driver)
-            
-            cards = driver.find_elements(By.CSS_SELECTOR, SELECTORS["job_card_list"])
+            with progress.phase("list_load", page=page):
+                load_full_job_list(driver, log, config.wait_stats, progress)
+                cards = driver.find_elements(By.CSS_SELECTOR, SELECTORS["job_card_list"])
+                card_ids = extract_attribute_list(driver, None, "data-job-id", cards)
+                config.block_stats.collect(driver)
+            # Incremental: cards at or below the high-water mark are left closed, and a page of only those ends the crawl
+            covered = {i for i in card_ids if mark is not None and mark.covers(i)}
+            new_cards = len(cards) - len(covered)
+            total_found += new_cards
+            progress.emit("found", new=new_cards, total=total_found)
+            if covered and not new_cards:
+                log("   Only postings from earlier runs on this page. Stopping pagination (incremental).")
+                break
+            # Cards scraped recently (by this or an earlier run) are not opened again. Cards skipped below
+            # are left out, so a batch registry never hands them to this run.
+            wanted = [i for i in card_ids if i not in processed and i not in covered]
+            fresh = seen.lookup("linkedin", wanted, config.fresh_for) if seen else {}
             
-            for i, card in enumerate(cards):
-                try:
-                    job_id = card.get_attribute("data-job-id")
-                    if not job_id: 
-                        try: job_id = card.find_element(By.TAG_NAME, "a").get_attribute("href").split("view/")[1].split("/")[0]
-                        except: pass
-                    
-                    if not job_id or job_id in processed: continue
-                    
-                    # Scroll sidebar to card to ensure it's clickable
-                    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
-                    time.sleep(0.2)
-                    
-                    try: card.click()
-                    except: driver.execute_script("arguments[0].click();", card)
-                    
-                    processed.add(job_id)
-                    # Scrape
-                    details = {"linkedin_job_id": job_id}
-                    for k, v in SELECTORS["detail_pane"].items():
-                        try:
-                            el = driver.find_element(By.CSS_SELECTOR, v)
-                            details[k] = " ".join(el.text.split())
-                        except: details[k] = None
-                    
+            with progress.phase("detail_extraction", page=page):
+                for i, card in enumerate(cards):
+                    config.check_deadline()
+                    reused = False
+                    try:
+                        job_id = card_ids[i] if i < len(card_ids) else None
+                        if not job_id: 
+                            try: job_id = card.find_element(By.TAG_NAME, "a").get_attribute("href").split("view/")[1].split("/")[0]
+                            except: pass
+                        
+                        if not job_id or job_id in processed or job_id in covered: continue
+                        if job_id in fresh:
+                            processed.add(job_id)
+                            details = fresh[job_id]
+                            reused = True
+                        else:
+                            details = scrape_card(driver, config, card, job_id, pane_title)
+                            pane_title = details.get('title')
+                            config.block_stats.collect(driver)
+                            processed.add(job_id)
+                            if seen and details.get('title'):
+                                seen.put("linkedin", job_id, details)
+                            elif fail:
+                                fail("linkedin", job_id)
+                    except Exception as e:
+                        if fail and job_id: fail("linkedin", job_id)
+                        if driver_lost(e): raise  # Checkpointed by the caller; the card is retried on resume
+                        progress.emit("error", message=describe_error(e))
+                        continue
+
+                    # Marked before the record is handed over: the consumer checkpoints only after writing it
+                    done.append(job_id)
                     if details.get('title'):
-                        all_data.append(details)
-                        print(f"   -> Scraped: {details['title']}")
-                except: continue
+                        if details.get('posted_date'): state.setdefault("newest_date", details['posted_date'])
+                        captured += 1
+                        log(f"   -> {'Reused' if reused else 'Scraped'}: {details['title']}")
+                        progress.emit("record", index=captured, total=total_found, title=details['title'], reused=reused)
+                        yield details
+                    else:
+                        progress.emit("skipped", index=i + 1, total=total_found, reason="no title")
             
             # Next Page
-            if page < MAX_PAGES_TO_SCRAPE:
-                try:
-                    btn = driver.find_element(By.CSS_SELECTOR, "button[aria-label='View next page']")
-                    if btn.is_enabled():
+            if page < config.max_pages:
+                with progress.phase("pagination", page=page):
+                    try:
+                        btn = driver.find_element(By.CSS_SELECTOR, "button[aria-label='View next page']")
+                        if not btn.is_enabled(): break
+                        state["page"] = page + 1
+                        config.save_checkpoint()
                         driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", btn)
                         btn.click()
-                        time.sleep(4)
-                    else: break
-                except: break
-
-        # Save
-        clean_kw = JOB_KEYWORDS.replace(" ", "_")
-        clean_loc = JOB_LOCATION.replace(" ", "_")
-        
-        # Ensure filename is safe
-        filename = f"linkedin_{clean_kw[:20]}_{clean_loc[:20]}.csv"
-        keys = ['linkedin_job_id', 'company_link', 'title', 'company_name', 'job_location', 'posted_date', 'salary_info', 'description']
-        
-        with open(filename, "w", newline="", encoding="utf-8") as f:
-            writer = csv.DictWriter(f, fieldnames=keys, extrasaction='ignore')
-            writer.writeheader()
-            writer.writerows(all_data)
+                        if cards:
+                            wait_for(driver, element_stale(cards[0]), 10, "next_page", config.wait_stats)
+                        wait_for(driver, element_present(SELECTORS["job_card_list"]), 10, "next_page_results", config.wait_stats)
+                    except Exception as e:
+                        if driver_lost(e): raise
+                        break
 
-    except Exception as e:
-        print(f"Fatal Error: {e}")
+        # Only a run that got through its pages raises the mark, so an interrupted one is crawled again
+        if mark is not None:
+            seen.raise_high_water(mark_key(config), done, state.get("newest_date"))
     finally:
-        driver.quit()
+        if config.driver_trace: config.driver_trace.detach(driver)
+        config.drop_driver(driver)
+        if owns_driver:
+            try: driver.quit()
+            except Exception: pass  # Already quit by the deadline watchdog
+            # A visible browser may be where the user just logged in: keep that session for later jobs
+            profiles.release(profile_path, keep_session=not config.headless)
+
+def scrape_card(driver, config, card, job_id, pane_title=None):
+    """Opens a card in the detail pane and extracts the job. pane_title is the title the pane showed before."""
+    # Scroll sidebar to card to ensure it's clickable
+    driver.execute_script("arguments[0].scrollIntoView({block: 'center'});", card)
+    wait_for(driver, element_clickable(card), 2, "card_clickable", config.wait_stats)
+    
+    try: card.click()
+    except Exception as e:
+        if driver_lost(e): raise
+        driver.execute_script("arguments[0].click();", card)
+    
+    # The URL switches on click, before the pane re-renders: wait for the pane itself, by a link or id of
+    # this job (not on every layout) or by its title changing. On timeout (e.g. two jobs with the same
+    # title) the fields are read anyway; the wait is counted as timed out in the job's waits.
+    pane_job = SELECTORS["detail_pane_job"].format(job_id=job_id)
+    wait_for(driver, any_of(element_present(pane_job), text_changed(SELECTORS["detail_pane"]["title"], pane_title)),
+             5, "detail_pane", config.wait_stats)
+    # Scrape (all fields in one round trip)
+    details = {"linkedin_job_id": job_id}
+    details.update(extract_fields(driver, SELECTORS["detail_pane"]))
+    return details
+
+def output_filename(config):
+    clean_kw = config.job_keywords.replace(" ", "_")
+    clean_loc = config.job_location.replace(" ", "_")
+    return f"linkedin_{clean_kw[:20]}_{clean_loc[:20]}.csv"
+
+def main():
+    config = ScrapeConfig(
+        job_keywords=JOB_KEYWORDS,
+        job_location=JOB_LOCATION,
+        max_pages=MAX_PAGES_TO_SCRAPE,
+        headless=HEADLESS,
+        workplace_type=JOB_WORKPLACE_TYPE,
+        incremental=INCREMENTAL,
+        progress=ProgressReporter.from_env(),
+        seen_index=SeenIndex(),
+    )
+    # Each record is written as soon as it is scraped; the file appears once the run finishes
+    filename = output_filename(config)
+    sink = RecordSink(filename[:-len(".csv")], FIELDNAMES)
+    try:
+        for details in scrape(config):
+            sink.write(details)
+    except Exception as e:
+        sink.abort()
+        print(f"Fatal Error: {e} (partial results kept in {sink.part_path('csv')})")
+        return
+    sink.close()
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
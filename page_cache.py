@@ -0,0 +1,171 @@
+import hashlib
+import os
+import threading
+import time
+import zlib
+from collections import OrderedDict
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# --- Configuration ---
+CACHE_DIR = "page_cache"
+MEMORY_BYTES = 32 * 1024 * 1024    # Decompressed HTML kept in memory
+DISK_BYTES = 512 * 1024 * 1024     # Compressed HTML kept on disk
+TTLS = {
+    "list": 10 * 60,        # Search results change as postings come and go
+    "detail": 12 * 3600,    # A posting's page rarely changes once published
+}
+DEFAULT_TTL = 10 * 60
+DROP_PARAMS = {"ref", "trk", "fbclid", "gclid"}  # Tracking parameters (and utm_*) that do not change the page
+
+def normalize_url(url):
+    """Cache key: lowercased scheme and host, no default port, fragment or tracking parameters, sorted query."""
+    parts = urlsplit(url)
+    scheme = parts.scheme.lower()
+    host = (parts.hostname or "").lower()
+    if parts.port and (scheme, parts.port) not in (("http", 80), ("https", 443)):
+        host += f":{parts.port}"
+    query = sorted((k, v) for k, v in parse_qsl(parts.query, keep_blank_values=True) if not (k in DROP_PARAMS or k.startswith("utm_")))
+    return urlunsplit((scheme, host, parts.path or "/", urlencode(query), ""))
+
+# --- Tiered Page Cache ---
+class PageCache:
+    """HTML by URL: an in-memory LRU in front of a zlib-compressed disk store, shared by all jobs.
+
+    Entries expire by page type (see TTLS). Both tiers evict least recently used entries once over
+    their byte budget. Concurrent misses for the same URL wait for a single fetch.
+    """
+    def __init__(self, directory=CACHE_DIR, memory_bytes=MEMORY_BYTES, disk_bytes=DISK_BYTES, ttls=None):
+        self.directory = directory
+        self.memory_bytes = memory_bytes
+        self.disk_bytes = disk_bytes
+        self.ttls = dict(TTLS, **(ttls or {}))
+        self._lock = threading.Lock()
+        self._memory = OrderedDict()  # key -> (stored_at, html)
+        self._memory_size = 0
+        self._disk = OrderedDict()    # file name -> (stored_at, size), least recently used first
+        self._disk_size = 0
+        self._inflight = {}           # key -> Event set when its fetch finishes
+        self.counters = dict.fromkeys(("memory_hits", "disk_hits", "misses", "stores", "evictions",
+                                       "expired", "bytes_served", "bytes_fetched", "bytes_stored"), 0)
+        os.makedirs(directory, exist_ok=True)
+        self._scan()
+
+    def _scan(self):
+        entries = []
+        for name in os.listdir(self.directory):
+            if not name.endswith(".z"): continue
+            st = os.stat(os.path.join(self.directory, name))
+            entries.append((st.st_mtime, name, st.st_size))
+        for mtime, name, size in sorted(entries):
+            self._disk[name] = (mtime, size)
+            self._disk_size += size
+
+    def _ttl(self, kind):
+        return self.ttls.get(kind, DEFAULT_TTL)
+
+    # --- Lookup ---
+    def get(self, url, kind):
+        key = normalize_url(url)
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".z"
+        cutoff = time.time() - self._ttl(kind)
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                if entry[0] >= cutoff:
+                    self._memory.move_to_end(key)
+                    self._count(memory_hits=1, bytes_served=len(entry[1]))
+                    return entry[1]
+                self._drop_memory(key)
+            disk_entry = self._disk.get(name)
+            if disk_entry is None or disk_entry[0] < cutoff:
+                self._count(misses=1, expired=1 if disk_entry else 0)
+                return None
+            self._disk.move_to_end(name)
+        try:
+            with open(os.path.join(self.directory, name), "rb") as f:
+                html = zlib.decompress(f.read()).decode("utf-8")
+        except (OSError, zlib.error):
+            with self._lock:
+                self._count(misses=1)
+            return None
+        with self._lock:
+            self._remember(key, disk_entry[0], html)
+            self._count(disk_hits=1, bytes_served=len(html))
+        return html
+
+    def fetch(self, url, kind, load):
+        """Cached HTML for url, calling load(url) on a miss. Only one caller loads a given URL at a time."""
+        key = normalize_url(url)
+        while True:
+            html = self.get(url, kind)
+            if html is not None: return html
+            with self._lock:
+                pending = self._inflight.get(key)
+                if pending is None:
+                    pending = self._inflight[key] = threading.Event()
+                    break
+            pending.wait()
+        try:
+            html = load(url)
+            self.put(url, kind, html)
+            with self._lock:
+                self._count(bytes_fetched=len(html))
+            return html
+        finally:
+            with self._lock:
+                self._inflight.pop(key).set()
+
+    # --- Store ---
+    def put(self, url, kind, html):
+        if not html: return
+        key = normalize_url(url)
+        name = hashlib.sha1(key.encode("utf-8")).hexdigest() + ".z"
+        now = time.time()
+        data = zlib.compress(html.encode("utf-8"), 6)
+        path = os.path.join(self.directory, name)
+        tmp = f"{path}.{threading.get_ident()}.tmp"
+        with open(tmp, "wb") as f:
+            f.write(data)
+        os.replace(tmp, path)
+        with self._lock:
+            self._remember(key, now, html)
+            old = self._disk.pop(name, None)
+            if old: self._disk_size -= old[1]
+            self._disk[name] = (now, len(data))
+            self._disk_size += len(data)
+            self._count(stores=1, bytes_stored=len(data))
+            victims = []
+            while self._disk_size > self.disk_bytes and len(self._disk) > 1:
+                victim, (_, size) = self._disk.popitem(last=False)
+                self._disk_size -= size
+                self._count(evictions=1)
+                victims.append(victim)
+        for victim in victims:
+            try: os.remove(os.path.join(self.directory, victim))
+            except OSError: pass
+
+    def _remember(self, key, stored_at, html):
+        self._drop_memory(key)
+        self._memory[key] = (stored_at, html)
+        self._memory_size += len(html)
+        while self._memory_size > self.memory_bytes and len(self._memory) > 1:
+            old_key = next(iter(self._memory))
+            self._drop_memory(old_key)
+            self._count(evictions=1)
+
+    def _drop_memory(self, key):
+        entry = self._memory.pop(key, None)
+        if entry: self._memory_size -= len(entry[1])
+
+    def _count(self, **deltas):
+        for name, delta in deltas.items():
+            self.counters[name] += delta
+
+    def stats(self):
+        with self._lock:
+            hits = self.counters["memory_hits"] + self.counters["disk_hits"]
+            lookups = hits + self.counters["misses"]
+            return dict(self.counters,
+                        hit_ratio=round(hits / lookups, 3) if lookups else None,
+                        memory_entries=len(self._memory), memory_bytes=self._memory_size,
+                        disk_entries=len(self._disk), disk_bytes=self._disk_size)
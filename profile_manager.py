@@ -0,0 +1,168 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+# --- Configuration ---
+SOURCE_PROFILE = "chrome_profile"   # Where the interactive (non-headless) login happens
+GOLDEN_PROFILE = "chrome_golden"    # Slim copy holding only session data, cloned for every browser
+CLONE_ROOT = "/dev/shm/scraper_profiles" if os.path.isdir("/dev/shm") else os.path.join(tempfile.gettempdir(), "scraper_profiles")
+CLONE_MAX_AGE = 3600                # Unknown clones older than this are leftovers of a crashed process
+PRUNE_INTERVAL = 3600
+
+# Files that carry the login; everything else (caches, history, service workers) is left behind
+SESSION_FILES = (
+    "Local State",
+    "Default/Preferences",
+    "Default/Secure Preferences",
+    "Default/Cookies",
+    "Default/Cookies-journal",
+    "Default/Network",
+    "Default/Local Storage",
+    "Default/Login Data",
+    "Default/Login Data-journal",
+    "Default/Web Data",
+)
+
+# Directories of the source profile that only grow and are safe to delete
+BLOAT_DIRS = (
+    "Default/Cache", "Default/Code Cache", "Default/GPUCache", "Default/Service Worker/CacheStorage",
+    "Default/Service Worker/ScriptCache", "Default/File System", "Default/IndexedDB", "GrShaderCache",
+    "ShaderCache", "GraphiteDawnCache", "component_crx_cache", "Crashpad",
+)
+
+def copy_session(source, target):
+    """Copies the session files that exist in source into target."""
+    for rel in SESSION_FILES:
+        src = os.path.join(source, rel)
+        dst = os.path.join(target, rel)
+        if os.path.isdir(src):
+            shutil.copytree(src, dst, dirs_exist_ok=True, ignore=shutil.ignore_patterns("*.lock", "LOCK"))
+        elif os.path.isfile(src):
+            os.makedirs(os.path.dirname(dst), exist_ok=True)
+            shutil.copy2(src, dst)
+
+def dir_size(path):
+    total = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try: total += os.path.getsize(os.path.join(root, name))
+            except OSError: pass
+    return total
+
+# --- Profile Manager ---
+class ProfileManager:
+    """Hands every browser a throwaway profile on tmpfs, seeded from a slim golden profile.
+
+    Concurrent browsers thereby share one login without contending for a profile lock, start
+    without loading an ever-growing cache, and never write their cache to disk.
+    """
+    def __init__(self, source=SOURCE_PROFILE, golden=GOLDEN_PROFILE, clone_root=CLONE_ROOT):
+        self.source = os.path.abspath(source)
+        self.golden = os.path.abspath(golden)
+        self.clone_root = clone_root
+        self._lock = threading.Lock()
+        self._live = set()  # Clones handed out by this process and not yet released
+        self._stats = {"clones": 0, "clone_time_total": 0.0, "golden_refreshes": 0, "pruned_clones": 0, "pruned_bytes": 0}
+
+    # --- Golden Profile ---
+    def _source_mtime(self):
+        mtimes = [os.path.getmtime(os.path.join(self.source, rel))
+                  for rel in SESSION_FILES if os.path.exists(os.path.join(self.source, rel))]
+        return max(mtimes) if mtimes else 0.0
+
+    def refresh_golden(self, force=False):
+        """Rebuilds the golden profile if the source session changed since the last build."""
+        with self._lock:
+            if not os.path.isdir(self.source): return False
+            source_mtime = self._source_mtime()
+            if not force and os.path.isdir(self.golden) and os.path.getmtime(self.golden) >= source_mtime:
+                return False
+            staging = f"{self.golden}.tmp"
+            shutil.rmtree(staging, ignore_errors=True)
+            os.makedirs(staging)
+            copy_session(self.source, staging)
+            shutil.rmtree(self.golden, ignore_errors=True)
+            os.replace(staging, self.golden)
+            os.utime(self.golden, (source_mtime, source_mtime))
+            self._stats["golden_refreshes"] += 1
+            return True
+
+    # --- Clones ---
+    def clone(self, prefix="job", session=True):
+        """A fresh profile directory for one browser; with session=True it holds the golden login."""
+        started = time.time()
+        os.makedirs(self.clone_root, exist_ok=True)
+        path = tempfile.mkdtemp(prefix=f"{prefix}_", dir=self.clone_root)
+        if session:
+            self.refresh_golden()
+            with self._lock:
+                if os.path.isdir(self.golden):
+                    copy_session(self.golden, path)
+        with self._lock:
+            self._live.add(path)
+            self._stats["clones"] += 1
+            self._stats["clone_time_total"] += time.time() - started
+        return path
+
+    def release(self, path, keep_session=False):
+        """Deletes a clone. keep_session saves its session back first (e.g. after an interactive login)."""
+        if not path: return
+        if keep_session:
+            with self._lock:
+                os.makedirs(self.source, exist_ok=True)
+                copy_session(path, self.source)
+            self.refresh_golden(force=True)
+        shutil.rmtree(path, ignore_errors=True)
+        with self._lock:
+            self._live.discard(path)
+
+    # --- Maintenance ---
+    def prune(self, max_age=CLONE_MAX_AGE):
+        """Deletes clones left behind by dead processes and the cache directories of the source profile."""
+        cutoff = time.time() - max_age
+        freed = 0
+        removed = 0
+        with self._lock:
+            live = set(self._live)
+        if os.path.isdir(self.clone_root):
+            for name in os.listdir(self.clone_root):
+                path = os.path.join(self.clone_root, name)
+                if path in live: continue
+                if os.path.isdir(path) and os.path.getmtime(path) < cutoff:
+                    freed += dir_size(path)
+                    shutil.rmtree(path, ignore_errors=True)
+                    removed += 1
+        for rel in BLOAT_DIRS:
+            path = os.path.join(self.source, rel)
+            if os.path.isdir(path):
+                freed += dir_size(path)
+                shutil.rmtree(path, ignore_errors=True)
+        self.refresh_golden()
+        with self._lock:
+            self._stats["pruned_clones"] += removed
+            self._stats["pruned_bytes"] += freed
+        return freed
+
+    def start_pruning(self, interval=PRUNE_INTERVAL):
+        def prune_loop():
+            while True:
+                try: self.prune()
+                except Exception as e: print(f"[PROFILES] Prune failed: {e}")
+                time.sleep(interval)
+        threading.Thread(target=prune_loop, daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            s = dict(self._stats)
+        clone_time = s.pop("clone_time_total")
+        s.update({
+            "clone_root": self.clone_root,
+            "clone_avg": round(clone_time / s["clones"], 4) if s["clones"] else None,
+            "golden_bytes": dir_size(self.golden) if os.path.isdir(self.golden) else 0,
+        })
+        return s
+
+# Shared by the scrapers and the driver pool
+profiles = ProfileManager()
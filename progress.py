@@ -0,0 +1,63 @@
+import json
+import os
+import threading
+import time
+from contextlib import contextmanager
+
+# --- Progress Protocol ---
+# Scrapers report progress as events: dicts with a "type" plus fields. Types in use:
+#   phase_start {phase}                 phase_end {phase, duration, ok}
+#   page {page}                         list_loaded {count}
+#   found {new, total}                  record {index, total, title, reused?}
+#   skipped {index, total, reason}      error {message, url}
+# Multi-platform runs (fanout.py) tag every event with {platform} and add:
+#   duplicate {platform, title}         platform_done {platform, status, error?}
+# In the server events are handed over in-process. Standalone runs can stream them as
+# JSON lines to a file descriptor named by SCRAPER_PROGRESS_FD.
+
+PROGRESS_FD_ENV = "SCRAPER_PROGRESS_FD"
+
+class ProgressReporter:
+    def __init__(self, handler=None):
+        self.handler = handler
+
+    def emit(self, type, **fields):
+        if self.handler is None: return
+        event = {"type": type, "ts": round(time.time(), 3)}
+        event.update(fields)
+        self.handler(event)
+
+    @contextmanager
+    def phase(self, name, **fields):
+        """Emits phase_start/phase_end around a block, with the block's duration."""
+        self.emit("phase_start", phase=name, **fields)
+        started = time.time()
+        ok = False
+        try:
+            yield
+            ok = True
+        finally:
+            self.emit("phase_end", phase=name, duration=round(time.time() - started, 3), ok=ok, **fields)
+
+    @classmethod
+    def from_env(cls):
+        """Reporter writing JSON lines to $SCRAPER_PROGRESS_FD, or a silent one if it is unset."""
+        fd = os.environ.get(PROGRESS_FD_ENV)
+        return cls(JsonLinesWriter(os.fdopen(int(fd), "w", buffering=1)) if fd else None)
+
+def describe_error(e):
+    """One-line error text for progress events (WebDriver messages span many lines)."""
+    text = str(e).strip()
+    return text.splitlines()[0] if text else type(e).__name__
+
+class JsonLinesWriter:
+    """Event handler writing one JSON object per line. Safe to share between worker threads."""
+    def __init__(self, stream):
+        self.stream = stream
+        self._lock = threading.Lock()
+
+    def __call__(self, event):
+        line = json.dumps(event, ensure_ascii=False) + "\n"
+        with self._lock:
+            self.stream.write(line)
+            self.stream.flush()
@@ -0,0 +1,120 @@
+import threading
+import time
+
+# Selenium
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from selenium.webdriver.common.by import By
+from selenium.webdriver.support.ui import WebDriverWait
+
+# --- Configuration ---
+POLL_INTERVAL = 0.1
+
+# --- Wait Statistics ---
+class WaitStats:
+    """Time spent waiting, per call site. Shared by every worker thread of a job."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._sites = {}
+
+    def record(self, site, elapsed, satisfied):
+        with self._lock:
+            s = self._sites.setdefault(site, {"calls": 0, "timeouts": 0, "total": 0.0, "max": 0.0})
+            s["calls"] += 1
+            s["total"] += elapsed
+            s["max"] = max(s["max"], elapsed)
+            if not satisfied: s["timeouts"] += 1
+
+    def summary(self):
+        with self._lock:
+            return {
+                site: {
+                    "calls": s["calls"],
+                    "timeouts": s["timeouts"],
+                    "total": round(s["total"], 3),
+                    "avg": round(s["total"] / s["calls"], 3),
+                    "max": round(s["max"], 3),
+                }
+                for site, s in self._sites.items()
+            }
+
+# --- Conditions ---
+# Each condition is a callable(driver) -> truthy when ready, like selenium's expected_conditions
+
+def element_present(css):
+    return lambda driver: driver.find_elements(By.CSS_SELECTOR, css)
+
+def element_clickable(element):
+    def check(driver):
+        try: return element.is_displayed() and element.is_enabled()
+        except WebDriverException: return False
+    return check
+
+def element_stale(element):
+    def check(driver):
+        try:
+            element.is_enabled()
+            return False
+        except WebDriverException:
+            return True
+    return check
+
+def count_above(css, count):
+    return lambda driver: len(driver.find_elements(By.CSS_SELECTOR, css)) > count
+
+def text_changed(css, previous):
+    """First match of css has text, and not the previous text."""
+    def check(driver):
+        els = driver.find_elements(By.CSS_SELECTOR, css)
+        text = " ".join(els[0].text.split()) if els else None
+        return bool(text) and text != previous
+    return check
+
+def url_contains(text):
+    return lambda driver: text in driver.current_url
+
+_NETWORK_IDLE_JS = """
+var w = window, now = performance.now();
+var n = performance.getEntriesByType('resource').length;
+if (w.__readyResources !== n) { w.__readyResources = n; w.__readyResourcesAt = now; }
+return document.readyState === 'complete' && now - w.__readyResourcesAt >= arguments[0];
+"""
+
+def network_idle(quiet_ms=500):
+    """No new resource requests have started for quiet_ms."""
+    return lambda driver: driver.execute_script(_NETWORK_IDLE_JS, quiet_ms)
+
+_DOM_QUIET_JS = """
+var w = window;
+if (!w.__readyObserver) {
+    w.__readyMutationAt = performance.now();
+    w.__readyObserver = new MutationObserver(function () { w.__readyMutationAt = performance.now(); });
+    w.__readyObserver.observe(document, {childList: true, subtree: true, attributes: true, characterData: true});
+}
+return performance.now() - w.__readyMutationAt >= arguments[0];
+"""
+
+def dom_quiet(quiet_ms=500):
+    """The DOM has not mutated for quiet_ms."""
+    return lambda driver: driver.execute_script(_DOM_QUIET_JS, quiet_ms)
+
+def any_of(*conditions):
+    def check(driver):
+        for condition in conditions:
+            result = condition(driver)
+            if result: return result
+        return False
+    return check
+
+# --- Waiting ---
+def wait_for(driver, condition, timeout=10, site="unnamed", stats=None):
+    """Waits until condition holds or timeout passes. Returns the condition's value, or None on timeout."""
+    started = time.time()
+    result = None
+    try:
+        result = WebDriverWait(driver, timeout, poll_frequency=POLL_INTERVAL,
+                               ignored_exceptions=(WebDriverException,)).until(condition)
+    except TimeoutException:
+        pass
+    if stats is not None:
+        stats.record(site, time.time() - started, result is not None)
+    return result
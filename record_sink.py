@@ -0,0 +1,252 @@
+import csv
+import gzip
+import hashlib
+import json
+import os
+import shutil
+import time
+
+# --- Configuration ---
+FSYNC_EVERY_RECORDS = 25
+FSYNC_EVERY_SECONDS = 5.0
+FORMATS = ("csv", "ndjson")
+COMPRESSIONS = (None, "gzip")
+COMPRESS_LEVEL = 6
+HASH_CHUNK = 1 << 20
+
+def manifest_path(path):
+    return f"{path}.manifest.json"
+
+def read_manifest(path):
+    """The manifest written next to a published output file, or None (e.g. files from before manifests)."""
+    try:
+        with open(manifest_path(path), "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (FileNotFoundError, json.JSONDecodeError):
+        return None
+
+# --- Output Files ---
+class _HashingWriter:
+    """Binary file wrapper hashing every byte written through it."""
+    def __init__(self, f, sha):
+        self.f = f
+        self.sha = sha
+
+    def write(self, data):
+        self.sha.update(data)
+        return self.f.write(data)
+
+    def flush(self):
+        self.f.flush()
+
+class OutputFile:
+    """Append-only text file that keeps its size and SHA-256 as it is written, optionally gzip-compressed.
+
+    A compressed file is a series of gzip members, one per checkpoint, so every checkpoint offset
+    is a member boundary that a resumed run can truncate to and append after. close() merges them
+    into a single member: many HTTP gzip decoders stop after the first one.
+    """
+    def __init__(self, path, compression=None, resume=None):
+        self.path = path
+        self.compression = compression
+        self.size = 0  # Uncompressed bytes
+        self._raw = open(path, "r+b" if resume else "wb")
+        self._out = _HashingWriter(self._raw, hashlib.sha256())
+        self._member = None
+        self.members = 0
+        if resume:
+            # Rehash the part kept, then drop anything written after the checkpoint
+            remaining = resume["offset"]
+            while remaining > 0:
+                chunk = self._raw.read(min(HASH_CHUNK, remaining))
+                if not chunk: raise ValueError(f"Partial output shorter than its checkpoint: {path}")
+                self._out.sha.update(chunk)
+                remaining -= len(chunk)
+            self._raw.truncate()
+            self.size = resume["size"]
+            self.members = resume.get("members")  # None: unknown (checkpoints from before members were counted)
+
+    def write(self, text):
+        data = text.encode("utf-8")
+        self.size += len(data)
+        if self.compression == "gzip":
+            if self._member is None:
+                self._member = gzip.GzipFile(fileobj=self._out, mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0)
+                if self.members is not None: self.members += 1
+            self._member.write(data)
+        else:
+            self._out.write(data)
+
+    def flush(self, sync=False):
+        if self._member is not None:
+            if not sync: return  # Flushing a gzip stream costs compression; wait for a sync point
+            self._member.flush()
+        self._raw.flush()
+        if sync: os.fsync(self._raw.fileno())
+
+    def _end_member(self):
+        if self._member is not None:
+            self._member.close()  # Writes the member trailer; the underlying file stays open
+            self._member = None
+
+    def checkpoint(self):
+        self._end_member()
+        self.flush(sync=True)
+        return {"offset": self._raw.tell(), "size": self.size, "members": self.members}
+
+    def close(self):
+        """Closes the file. Returns its stored byte size and SHA-256 (and gzip member count)."""
+        if self.compression == "gzip" and self._raw.tell() == 0 and self._member is None:
+            self.write("")  # Even an empty output is a valid gzip file
+        self._end_member()
+        self.flush(sync=True)
+        self._raw.close()
+        if self.compression != "gzip":
+            return {"bytes": os.path.getsize(self.path), "uncompressed_bytes": self.size, "sha256": self._out.sha.hexdigest()}
+        if self.members != 1: self._merge_members()
+        return {"bytes": os.path.getsize(self.path), "uncompressed_bytes": self.size, "sha256": self._out.sha.hexdigest(),
+                "members": self.members}
+
+    def _merge_members(self):
+        """Recompresses the file as one gzip member (decompressing members reads them all back to back)."""
+        tmp = f"{self.path}.merge"
+        sha = hashlib.sha256()
+        with gzip.open(self.path, "rb") as src, open(tmp, "wb") as raw:
+            with gzip.GzipFile(fileobj=_HashingWriter(raw, sha), mode="wb", compresslevel=COMPRESS_LEVEL, mtime=0) as dst:
+                shutil.copyfileobj(src, dst, HASH_CHUNK)
+            raw.flush()
+            os.fsync(raw.fileno())
+        os.replace(tmp, self.path)
+        self._out.sha = sha
+        self.members = 1
+
+    def abort(self):
+        self._end_member()
+        self.flush(sync=True)
+        self._raw.close()
+
+# --- Streaming Record Sink ---
+class RecordSink:
+    """Appends each record to <base>.<fmt>[.gz].part as it arrives and publishes the final files atomically on close().
+
+    Every published file gets a <file>.manifest.json sidecar with its row count, byte sizes and SHA-256,
+    all tracked while writing. Pass resume=<value of a previous checkpoint()> to continue an
+    interrupted run's .part files (with the compression that run used).
+    """
+    def __init__(self, base_path, fieldnames, formats=("csv",), resume=None, compression=None):
+        unknown = [fmt for fmt in formats if fmt not in FORMATS]
+        if unknown or not formats:
+            raise ValueError(f"Unsupported output format: {', '.join(unknown) or 'none'}")
+        if resume: compression = resume.get("compression")
+        if compression not in COMPRESSIONS:
+            raise ValueError(f"Unsupported compression: {compression}")
+        self.base_path = base_path
+        self.fieldnames = list(fieldnames)
+        self.formats = tuple(formats)
+        self.compression = compression
+        self.count = 0
+        self.manifests = {}
+        self._files = {}
+        self._csv_writer = None
+        self._unsynced = 0
+        self._last_sync = time.time()
+        if resume: self._reopen(resume)
+        else: self._open()
+
+    def final_path(self, fmt):
+        return f"{self.base_path}.{fmt}" + (".gz" if self.compression == "gzip" else "")
+
+    def part_path(self, fmt):
+        return self.final_path(fmt) + ".part"
+
+    @property
+    def paths(self):
+        return [self.final_path(fmt) for fmt in self.formats]
+
+    def _open(self):
+        for fmt in self.formats:
+            self._files[fmt] = OutputFile(self.part_path(fmt), self.compression)
+            if fmt == "csv":
+                self._csv_writer = csv.DictWriter(self._files[fmt], fieldnames=self.fieldnames, extrasaction='ignore')
+                self._csv_writer.writeheader()
+        self._flush(sync=True)
+
+    def _reopen(self, resume):
+        offsets = resume["offsets"]
+        sizes = resume.get("sizes", offsets)  # Uncompressed checkpoints from before sizes were recorded
+        members = resume.get("members", {})
+        for fmt in self.formats:
+            if fmt not in offsets or not os.path.exists(self.part_path(fmt)):
+                raise FileNotFoundError(f"Partial output missing: {self.part_path(fmt)}")
+        for fmt in self.formats:
+            self._files[fmt] = OutputFile(self.part_path(fmt), self.compression,
+                                          resume={"offset": offsets[fmt], "size": sizes[fmt],
+                                                  "members": members.get(fmt)})
+            if fmt == "csv":
+                self._csv_writer = csv.DictWriter(self._files[fmt], fieldnames=self.fieldnames, extrasaction='ignore')
+        self.count = resume["count"]
+
+    def checkpoint(self):
+        """Syncs the files and returns the state needed to resume them."""
+        states = {fmt: f.checkpoint() for fmt, f in self._files.items()}
+        self._unsynced = 0
+        self._last_sync = time.time()
+        return {
+            "count": self.count,
+            "compression": self.compression,
+            "offsets": {fmt: state["offset"] for fmt, state in states.items()},
+            "sizes": {fmt: state["size"] for fmt, state in states.items()},
+            "members": {fmt: state["members"] for fmt, state in states.items()},
+        }
+
+    def write(self, record):
+        if "csv" in self._files:
+            self._csv_writer.writerow(record)
+        if "ndjson" in self._files:
+            row = {k: record.get(k) for k in self.fieldnames}
+            self._files["ndjson"].write(json.dumps(row, ensure_ascii=False) + "\n")
+        self.count += 1
+        self._unsynced += 1
+        due = self._unsynced >= FSYNC_EVERY_RECORDS or time.time() - self._last_sync >= FSYNC_EVERY_SECONDS
+        self._flush(sync=due)
+
+    def _flush(self, sync=False):
+        for f in self._files.values():
+            f.flush(sync)
+        if sync:
+            self._unsynced = 0
+            self._last_sync = time.time()
+
+    def close(self):
+        """Publishes every .part file under its final name, then its manifest. Returns the final paths."""
+        stats = {fmt: f.close() for fmt, f in self._files.items()}
+        self._files = {}
+        for fmt, s in stats.items():
+            path = self.final_path(fmt)
+            os.replace(self.part_path(fmt), path)
+            manifest = dict(s, format=fmt, file=os.path.basename(path), compression=self.compression,
+                            rows=self.count, created_at=time.time())
+            tmp = manifest_path(path) + ".tmp"
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(manifest, f)
+            os.replace(tmp, manifest_path(path))
+            self.manifests[fmt] = manifest
+        return self.paths
+
+    def abort(self, keep_partial=True):
+        """Stops writing without publishing. Partial files stay on disk unless keep_partial is False."""
+        for f in self._files.values():
+            f.abort()
+        self._files = {}
+        if not keep_partial:
+            for fmt in self.formats:
+                try: os.remove(self.part_path(fmt))
+                except FileNotFoundError: pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None: self.close()
+        else: self.abort()
+        return False
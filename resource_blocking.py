@@ -0,0 +1,99 @@
+import json
+import threading
+
+# Selenium
+from selenium.common.exceptions import WebDriverException
+
+# --- Configuration ---
+# Resource types we never need, as URL patterns for Network.setBlockedURLs (CDP blocks by URL only)
+BLOCKED_TYPES = {
+    "Image": ["*.png*", "*.jpg*", "*.jpeg*", "*.gif*", "*.webp*", "*.avif*", "*.ico*", "*.svg*",
+              "*media.licdn.com/dms/image/*"],
+    "Font": ["*.woff*", "*.ttf*", "*.otf*", "*.eot*", "*fonts.googleapis.com/*", "*fonts.gstatic.com/*"],
+    "Media": ["*.mp4*", "*.webm*", "*.m3u8*", "*.mp3*", "*dms.licdn.com/playlist/*"],
+}
+
+# Ads and analytics beacons
+BLOCKED_URLS = [
+    "*doubleclick.net/*", "*googlesyndication.com/*", "*google-analytics.com/*", "*googletagmanager.com/*",
+    "*googleadservices.com/*", "*connect.facebook.net/*", "*hotjar.com/*", "*segment.io/*", "*segment.com/*",
+    "*plausible.io/*", "*px.ads.linkedin.com/*", "*linkedin.com/li/track*", "*linkedin.com/px/*",
+    "*snap.licdn.com/li.lms-analytics/*", "*ads.linkedin.com/*", "*bat.bing.com/*", "*scorecardresearch.com/*",
+]
+
+MAX_PENDING_REQUESTS = 10_000  # In-flight request types remembered between two collect() calls
+
+def resource_types(names):
+    """Validates a job's list of resource types to block (keys of BLOCKED_TYPES)."""
+    if isinstance(names, str): names = [names]
+    unknown = [n for n in names if n not in BLOCKED_TYPES]
+    if unknown:
+        raise ValueError(f"Unknown resource type to block: {', '.join(map(str, unknown))} (known: {', '.join(BLOCKED_TYPES)})")
+    return tuple(names)
+
+def blocklist(types=tuple(BLOCKED_TYPES), urls=BLOCKED_URLS):
+    patterns = [p for t in types for p in BLOCKED_TYPES.get(t, [])]
+    return patterns + list(urls)
+
+def enable_performance_log(options):
+    """Launch option: lets BlockStats.collect() read network events from chromedriver."""
+    options.set_capability("goog:loggingPrefs", {"performance": "ALL"})
+
+def apply_blocking(driver, patterns):
+    """Sets the browser's blocklist (an empty list unblocks everything, e.g. for a reused pool browser)."""
+    driver.execute_cdp_cmd("Network.enable", {})
+    driver.execute_cdp_cmd("Network.setBlockedURLs", {"urls": list(patterns)})
+
+def setup_blocking(driver, patterns, log=print):
+    """Applies a job's blocklist (empty: clears it). A browser without CDP just loads everything."""
+    try:
+        apply_blocking(driver, patterns)
+    except WebDriverException as e:
+        log(f"   Resource blocking unavailable: {e.msg}")
+
+# --- Statistics ---
+class BlockStats:
+    """Requests loaded and blocked, and bytes loaded, per resource type. Shared by every worker thread of a job."""
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._types = {}
+        self._requests = {}  # requestId -> resource type, for events that do not carry it
+
+    def collect(self, driver):
+        """Drains the browser's performance log. Call after page loads; browsers without the log are ignored."""
+        try:
+            entries = driver.get_log("performance")
+        except (WebDriverException, ValueError):
+            return
+        with self._lock:
+            if len(self._requests) > MAX_PENDING_REQUESTS: self._requests.clear()
+            for entry in entries:
+                try:
+                    message = json.loads(entry["message"])["message"]
+                except (KeyError, ValueError):
+                    continue
+                method, params = message.get("method"), message.get("params", {})
+                if method == "Network.requestWillBeSent":
+                    self._requests[params.get("requestId")] = params.get("type", "Other")
+                elif method == "Network.loadingFinished":
+                    kind = self._requests.pop(params.get("requestId"), "Other")
+                    s = self._bucket(kind)
+                    s["loaded"] += 1
+                    s["bytes_loaded"] += int(params.get("encodedDataLength", 0))
+                elif method == "Network.loadingFailed":
+                    kind = params.get("type") or self._requests.get(params.get("requestId"), "Other")
+                    self._requests.pop(params.get("requestId"), None)
+                    if params.get("blockedReason") == "inspector":  # Blocked by setBlockedURLs
+                        self._bucket(kind)["blocked"] += 1
+
+    def _bucket(self, kind):
+        return self._types.setdefault(kind, {"loaded": 0, "blocked": 0, "bytes_loaded": 0})
+
+    def summary(self):
+        with self._lock:
+            types = {kind: dict(s) for kind, s in self._types.items()}
+        return {
+            "blocked": sum(s["blocked"] for s in types.values()),
+            "bytes_loaded": sum(s["bytes_loaded"] for s in types.values()),
+            "by_type": types,
+        }
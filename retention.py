@@ -0,0 +1,166 @@
+import os
+import re
+import sqlite3
+import threading
+import time
+
+from record_sink import manifest_path
+
+# --- Configuration ---
+RETENTION_DB_PATH = "output_index.db"
+MAX_AGE = 3 * 24 * 3600        # Outputs neither written nor downloaded for this long are deleted
+MAX_TOTAL_BYTES = 5 * 2**30    # Disk quota for all outputs; least recently used go first beyond it
+SWEEP_INTERVAL = 600
+SWEEP_BATCH = 200              # Files deleted per query, so a sweep never holds the lock for long
+
+# {platform}_{job_id}_{timestamp}.<fmt>[.gz][.part]
+JOB_FILE_PATTERN = re.compile(r"_(\d+)_\d{8}_\d{6}\.")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outputs (
+    path TEXT PRIMARY KEY,
+    job_id INTEGER,
+    bytes INTEGER NOT NULL,
+    mtime REAL NOT NULL,
+    last_used REAL NOT NULL
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_outputs_last_used ON outputs(last_used);
+"""
+
+def job_id_from_name(name):
+    match = JOB_FILE_PATTERN.search(name)
+    return int(match.group(1)) if match else None
+
+def file_bytes(path):
+    """Size of an output file together with its manifest sidecar."""
+    total = 0
+    for p in (path, manifest_path(path)):
+        try: total += os.path.getsize(p)
+        except OSError: pass
+    return total
+
+# --- Retention Manager ---
+class RetentionManager:
+    """Index of output files (size, mtime, job id, last use) that enforces an age limit and a disk quota.
+
+    Files are registered as jobs publish them and touched when downloaded, so sweeps are index queries:
+    the output directory is only scanned once, to import files written before the index existed.
+    on_evict(job_id, paths) is called for the files of each job a sweep deleted.
+    """
+    def __init__(self, directory, path=RETENTION_DB_PATH, max_age=MAX_AGE, max_bytes=MAX_TOTAL_BYTES, on_evict=None):
+        self.directory = directory
+        self.max_age = max_age
+        self.max_bytes = max_bytes
+        self.on_evict = on_evict
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if self._conn.execute("PRAGMA user_version").fetchone()[0] == 0:
+            self._import_directory()
+            self._conn.execute("PRAGMA user_version = 1")
+        self._total = self._conn.execute("SELECT COALESCE(SUM(bytes), 0) FROM outputs").fetchone()[0]
+        self._stats = {"evicted_age": 0, "evicted_quota": 0, "evicted_bytes": 0, "delete_errors": 0}
+
+    def _import_directory(self):
+        rows = []
+        with os.scandir(self.directory) as entries:
+            for entry in entries:
+                if not entry.is_file() or entry.name.endswith(".manifest.json"): continue
+                mtime = entry.stat().st_mtime
+                rows.append((entry.path, job_id_from_name(entry.name), file_bytes(entry.path), mtime, mtime))
+        self._conn.executemany("INSERT OR IGNORE INTO outputs (path, job_id, bytes, mtime, last_used) "
+                               "VALUES (?, ?, ?, ?, ?)", rows)
+
+    # --- Index Updates ---
+    def add(self, path, job_id=None):
+        """Registers a file written for a job. A published file replaces the index entry of its .part file."""
+        size = file_bytes(path)
+        mtime = os.path.getmtime(path)
+        with self._lock:
+            self._forget(f"{path}.part")
+            self._forget(path)
+            self._conn.execute("INSERT INTO outputs (path, job_id, bytes, mtime, last_used) VALUES (?, ?, ?, ?, ?)",
+                               (path, job_id, size, mtime, time.time()))
+            self._total += size
+
+    def touch(self, path):
+        """Marks a file as used now (e.g. downloaded), moving it to the back of the eviction order."""
+        with self._lock:
+            self._conn.execute("UPDATE outputs SET last_used = ? WHERE path = ?", (time.time(), path))
+
+    def _forget(self, path):
+        row = self._conn.execute("SELECT bytes FROM outputs WHERE path = ?", (path,)).fetchone()
+        if row is None: return
+        self._conn.execute("DELETE FROM outputs WHERE path = ?", (path,))
+        self._total -= row[0]
+
+    # --- Eviction ---
+    def sweep(self):
+        """Deletes files past the age limit, then least recently used files until the quota holds."""
+        evicted = {}
+        cutoff = time.time() - self.max_age
+        while True:
+            with self._lock:
+                rows = self._conn.execute("SELECT path, job_id, bytes FROM outputs WHERE last_used < ? "
+                                          "ORDER BY last_used LIMIT ?", (cutoff, SWEEP_BATCH)).fetchall()
+                if not rows: break
+                self._delete(rows, "evicted_age", evicted)
+        while True:
+            with self._lock:
+                if self._total <= self.max_bytes: break
+                rows = self._conn.execute("SELECT path, job_id, bytes FROM outputs ORDER BY last_used LIMIT ?",
+                                          (SWEEP_BATCH,)).fetchall()
+                if not rows: break
+                over = self._total - self.max_bytes
+                batch = []
+                for row in rows:
+                    if over <= 0: break
+                    batch.append(row)
+                    over -= row[2]
+                if not self._delete(batch, "evicted_quota", evicted): break
+        if self.on_evict:
+            for job_id, paths in evicted.items():
+                self.on_evict(job_id, paths)
+        return sum(len(paths) for paths in evicted.values())
+
+    def _delete(self, rows, reason, evicted):
+        deleted = 0
+        for path, job_id, size in rows:
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            except OSError as e:
+                # Keep the entry but move it to the back, so one stuck file cannot stall every sweep
+                print(f"[RETENTION] Could not delete {path}: {e}")
+                self._stats["delete_errors"] += 1
+                self._conn.execute("UPDATE outputs SET last_used = ? WHERE path = ?", (time.time(), path))
+                continue
+            try: os.remove(manifest_path(path))
+            except OSError: pass
+            self._forget(path)
+            deleted += 1
+            self._stats[reason] += 1
+            self._stats["evicted_bytes"] += size
+            if job_id is not None:
+                evicted.setdefault(job_id, []).append(path)
+        return deleted
+
+    def start(self, interval=SWEEP_INTERVAL):
+        def sweep_loop():
+            while True:
+                try: self.sweep()
+                except Exception as e: print(f"[RETENTION] Sweep failed: {e}")
+                time.sleep(interval)
+        threading.Thread(target=sweep_loop, daemon=True).start()
+
+    def stats(self):
+        with self._lock:
+            files = self._conn.execute("SELECT COUNT(*) FROM outputs").fetchone()[0]
+            return dict(self._stats, files=files, bytes=self._total, max_bytes=self.max_bytes, max_age=self.max_age)
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
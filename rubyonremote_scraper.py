@@ -1,12 +1,19 @@
-import csv
 import json
-import os
+import queue
 import re
-import sys
+import threading
 import time
 import platform
 import random
-from urllib.parse import quote_plus
+from concurrent.futures import ThreadPoolExecutor
+from contextlib import contextmanager
+from urllib.parse import quote_plus, urljoin
+
+# HTTP engine
+import requests
+from bs4 import BeautifulSoup, Comment, NavigableString
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 
 # Selenium
 from selenium import webdriver
@@ -17,28 +24,61 @@ from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
 from webdriver_manager.chrome import ChromeDriverManager
 
+from driver_pool import allocate_port, driver_lost
+from driver_trace import traced
+from page_cache import PageCache
+from profile_manager import profiles
+from extraction import extract_attribute_list, extract_fields
+from progress import ProgressReporter, describe_error
+from resource_blocking import enable_performance_log, setup_blocking
+from readiness import any_of, dom_quiet, element_present, network_idle, wait_for
+from record_sink import RecordSink
+from scrape_config import ScrapeConfig
+from seen_index import SeenIndex, query_key
+
 # --- Configuration ---
 JOB_KEYWORDS = "Ruby on Rails" 
 JOB_LOCATION = "Vietnam"       
 MAX_PAGES_TO_SCRAPE = 3  # Set this to > 1 to test pagination
 HEADLESS = False
+DETAIL_WORKERS = 3  # Browsers used in parallel for the details phase
+DETAIL_DELAY = 1.0  # Polite delay between page loads, per worker
+ENGINE = "browser"  # "browser" drives Chrome, "http" fetches the server-rendered HTML directly
+HTTP_CONCURRENCY = 8
+INCREMENTAL = False  # Only collect postings newer than those of earlier runs of the same search
+BASE_URL = "https://rubyonremote.com"
+
+USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/120.0.0.0 Safari/537.36"
+
+FIELDNAMES = ["rubyonremote_job_id", "url", "title", "company", "date", "description"]
+
+# --- Selectors ---
+SELECTORS = {
+    "job_link": "li a[href^='/jobs/']",
+    "next_page": "a[rel='next']",
+    "detail_page": {
+        "title": "h1.schema-job-title",
+        "company": "div.rounded-lg h3",
+        "date": {"xpath": "//h2[contains(text(), 'Published on')]", "strip": "Published on"},
+        "description": "div.schema-job-description",
+    }
+}
 
 # --- URL Logic ---
 def slugify(text):
     if not text: return ""
     return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
 
-def construct_search_url():
-    base = "https://rubyonremote.com"
-    parts = ["remote", slugify(JOB_KEYWORDS), "jobs"]
-    if JOB_LOCATION:
-        parts.extend(["in", slugify(JOB_LOCATION)])
+def construct_search_url(keywords=JOB_KEYWORDS, location=JOB_LOCATION, base=BASE_URL):
+    parts = ["remote", slugify(keywords), "jobs"]
+    if location:
+        parts.extend(["in", slugify(location)])
     return f"{base}/{'-'.join(parts)}/"
 
 # --- Browser Setup ---
-def setup_driver():
-    current_dir = os.getcwd()
-    local_profile_path = os.path.join(current_dir, "chrome_profile")
+def setup_driver(headless=HEADLESS, profile_path=None, debugging_port=None):
+    # No login needed here: normally an empty throwaway profile from profile_manager.py
+    local_profile_path = profile_path or profiles.source
     
     options = ChromeOptions()
     options.add_argument(f"--user-data-dir={local_profile_path}")
@@ -48,147 +88,477 @@ def setup_driver():
     options.add_argument("--disable-dev-shm-usage")
     options.add_argument("--window-size=1280,1024")
     options.add_argument("--log-level=3")
-    options.add_argument("--remote-debugging-port=9222")
-    if HEADLESS: options.add_argument("--headless=new")
+    options.add_argument(f"--remote-debugging-port={debugging_port or allocate_port()}")
+    if headless: options.add_argument("--headless=new")
+    enable_performance_log(options)
 
     try:
         service = ChromeService(ChromeDriverManager().install())
         driver = webdriver.Chrome(service=service, options=options)
         return driver
     except Exception as e:
-        print(f"FATAL: {e}")
-        sys.exit(1)
+        raise RuntimeError(f"Could not start Chrome: {e}")
+
+@contextmanager
+def worker_driver(config):
+    """Yields a browser for a detail worker: leased if the lease factory has one to spare, else launched."""
+    if config.lease_driver:
+        with config.lease_driver() as driver:
+            if driver is not None:
+                config.use_driver(driver)
+                try: yield driver
+                finally: config.drop_driver(driver)
+                return
+    # Extra browsers cannot share the main profile directory or debugging port
+    profile_path = profiles.clone("rubyonremote_worker", session=False)
+    try:
+        driver = setup_driver(config.headless, profile_path, allocate_port())
+        config.use_driver(driver)
+        try: yield driver
+        finally:
+            config.drop_driver(driver)
+            try: driver.quit()
+            except Exception: pass  # Already quit by the deadline watchdog
+    finally:
+        profiles.release(profile_path)
 
 # --- Helper ---
 def clean_text(text):
     if not text: return None
     return " ".join(text.split())
 
+class RateLimiter:
+    def __init__(self, min_interval):
+        self.min_interval = min_interval
+        self.last = 0.0
+
+    def wait(self):
+        delay = self.last + self.min_interval - time.time()
+        if delay > 0: time.sleep(delay)
+        self.last = time.time()
+
 # --- Main Logic ---
-def main():
-    driver = setup_driver()
+def scrape(config):
+    """Yields one record per job detail page. Quits the browser only if it launched it."""
+    if config.engine == "http":
+        yield from scrape_http(config)
+        return
+
+    log = config.log
+    progress = config.progress
+    owns_driver = config.driver is None
+    if owns_driver:
+        profile_path = profiles.clone("rubyonremote", session=False)
+        try:
+            with progress.phase("driver_startup"):
+                driver = setup_driver(config.headless, profile_path, config.debugging_port)
+        except Exception:
+            profiles.release(profile_path)
+            raise
+    else:
+        driver = config.driver
+    if config.driver_trace: config.driver_trace.attach(driver)
+    config.use_driver(driver)
     try:
-        search_url = construct_search_url()
-        print(f"Scanning: {search_url}")
+        setup_blocking(driver, config.blocklist(), log)
+        search_url = construct_search_url(config.job_keywords, config.job_location, config.base_url or BASE_URL)
+        log(f"Scanning: {search_url}")
+        state = crawl_state(config, search_url)
+        all_links = state["all_links"]
+        mark = high_water_mark(config)
         
         # Phase 1: Collect Links across Multiple Pages
-        driver.get(search_url)
-        time.sleep(3)
-        
-        all_links = []
-        
-        for page_num in range(1, MAX_PAGES_TO_SCRAPE + 1):
-            print(f"--- Collecting Links: Page {page_num} ---")
-            
-            # Scroll to trigger lazy loading
-            driver.execute_script("window.scrollTo(0, document.body.scrollHeight/1.5);")
-            time.sleep(1.5)
+        if not state["links_complete"]:
+            if state["page_num"] > 1:
+                log(f"   Resuming link collection at page {state['page_num']}...")
+            with progress.phase("search_load"):
+                driver.get(state["page_url"])
+                wait_for_listing(driver, config)
             
-            # Grab job cards
-            cards = driver.find_elements(By.CSS_SELECTOR, "li a[href^='/jobs/']")
-            new_count = 0
-            for card in cards:
-                try: 
-                    url = card.get_attribute("href")
-                    if url and url not in all_links:
-                        all_links.append(url)
-                        new_count += 1
-                except: pass
-            
-            print(f"   Found {new_count} new jobs on this page.")
-            
-            # Pagination Logic
-            if page_num < MAX_PAGES_TO_SCRAPE:
-                try:
-                    # Look for the 'Next' button specifically using rel="next"
-                    next_btn = driver.find_element(By.CSS_SELECTOR, "a[rel='next']")
-                    next_url = next_btn.get_attribute("href")
+            for page_num in range(state["page_num"], config.max_pages + 1):
+                config.check_deadline()
+                log(f"--- Collecting Links: Page {page_num} ---")
+                progress.emit("page", page=page_num)
+                
+                with progress.phase("list_load", page=page_num):
+                    # Scroll to trigger lazy loading
+                    driver.execute_script("window.scrollTo(0, document.body.scrollHeight/1.5);")
+                    wait_for(driver, network_idle(500), 5, "lazy_load", config.wait_stats)
                     
-                    if next_url:
-                        print(f"   Navigating to Page {page_num + 1}...")
-                        driver.get(next_url)
-                        time.sleep(3) # Wait for page load
-                    else:
-                        print("   'Next' button found but has no link. Stopping.")
-                        break
-                except:
-                    print("   No 'Next' button found. Reached last page.")
-                    break
+                    # Grab job cards (all hrefs in one round trip)
+                    new_count, covered = add_links(all_links, extract_attribute_list(driver, SELECTORS["job_link"], "href"), mark)
+                    config.block_stats.collect(driver)
+                
+                log(f"   Found {new_count} new jobs on this page.")
+                progress.emit("found", new=new_count, total=len(all_links))
+                if reached_mark(config, new_count, covered): break
+                
+                # Pagination Logic
+                if page_num < config.max_pages:
+                    with progress.phase("pagination", page=page_num):
+                        try:
+                            # Look for the 'Next' button specifically using rel="next"
+                            next_btn = driver.find_element(By.CSS_SELECTOR, SELECTORS["next_page"])
+                            next_url = next_btn.get_attribute("href")
+                        except Exception as e:
+                            if driver_lost(e): raise
+                            next_url = None
+                            log("   No 'Next' button found. Reached last page.")
+                        
+                        if next_url:
+                            log(f"   Navigating to Page {page_num + 1}...")
+                            state.update(page_num=page_num + 1, page_url=next_url)
+                            config.save_checkpoint()
+                            driver.get(next_url)
+                            wait_for_listing(driver, config)
+                    if not next_url: break
+
+            state["links_complete"] = True
+            config.save_checkpoint()
             
         # Phase 2: Details Extraction
-        print(f"\nTotal unique jobs found: {len(all_links)}")
-        print("Extracting details...")
-        
-        all_data = []
-        
-        for i, url in enumerate(all_links):
+        yield from emit_details(config, state, lambda links: extract_all_details(driver, config, links))
+    finally:
+        if config.driver_trace: config.driver_trace.detach(driver)
+        config.drop_driver(driver)
+        if owns_driver:
+            try: driver.quit()
+            except Exception: pass  # Already quit by the deadline watchdog
+            profiles.release(profile_path)
+
+def crawl_state(config, search_url):
+    """Frontier of a run. Lives in the job checkpoint, so a resumed run picks up where it stopped."""
+    state = config.checkpoint_state()
+    state.setdefault("all_links", [])
+    state.setdefault("page_num", 1)
+    state.setdefault("page_url", search_url)
+    state.setdefault("links_complete", False)
+    state.setdefault("details_done", [])
+    return state
+
+def posting_id(url):
+    match = re.search(r"/jobs/(\d+)-", url)
+    return match.group(1) if match else None
+
+def mark_key(config):
+    return query_key("rubyonremote", config.job_keywords, config.job_location)
+
+def high_water_mark(config):
+    """The search's high-water mark in incremental mode, else None."""
+    if not (config.incremental and config.seen_index): return None
+    return config.seen_index.high_water(mark_key(config))
+
+def add_links(all_links, urls, mark=None):
+    """Appends a listing page's links not collected yet, leaving out those at or below the mark.
+
+    Returns how many were added and how many the mark covered.
+    """
+    added = covered = 0
+    for url in urls:
+        if not url or url in all_links: continue
+        if mark is not None and mark.covers(posting_id(url)):
+            covered += 1
+            continue
+        all_links.append(url)
+        added += 1
+    return added, covered
+
+def reached_mark(config, new_count, covered):
+    """True when an incremental crawl reaches a page of only already-seen postings: the rest is older."""
+    if new_count or not covered: return False
+    config.log("   Only postings from earlier runs on this page. Stopping pagination (incremental).")
+    return True
+
+def emit_details(config, state, extract):
+    """Runs extract() over the links without a finished detail page and yields the records.
+
+    Postings the seen index scraped recently are not fetched again; their stored record is
+    yielded in their listing position instead.
+    """
+    log = config.log
+    progress = config.progress
+    all_links = state["all_links"]
+    done = state["details_done"]
+    finished = set(done)
+    pending = [url for url in all_links if url not in finished]
+
+    log(f"Total unique jobs found: {len(all_links)}")
+    if finished:
+        log(f"   Resuming: {len(finished)} jobs already extracted.")
+
+    seen = config.seen_index
+    fail = getattr(seen, "fail", None)  # Batch registry only: frees a posting it handed to this run
+    fresh = seen.lookup("rubyonremote", map(posting_id, pending), config.fresh_for) if seen else {}
+    if fresh:
+        log(f"   {len(fresh)} jobs were scraped recently, reusing their records.")
+    log("Extracting details...")
+
+    offset = len(all_links) - len(pending)
+    total = len(all_links)
+    fetched = extract([url for url in pending if posting_id(url) not in fresh])
+    try:
+        with progress.phase("detail_extraction"):
+            for i, url in enumerate(pending):
+                config.check_deadline()
+                reused = posting_id(url) in fresh
+                if reused:
+                    data = dict(fresh[posting_id(url)], url=url)
+                else:
+                    _, _, data = next(fetched)
+                    if seen and data and data['title']:
+                        seen.put("rubyonremote", posting_id(url), data)
+                    elif fail:
+                        fail("rubyonremote", posting_id(url))
+                # Marked before the record is handed over: the consumer checkpoints only after writing it.
+                # A failed fetch is not marked, so a resumed run retries it
+                if data: done.append(url)
+                if data and data['title']:
+                    if data.get('date'): state.setdefault("newest_date", data['date'])
+                    log(f"[{offset+i+1}/{total}] {'Reused' if reused else 'Scraped'}: {data['title']}")
+                    progress.emit("record", index=offset + i + 1, total=total, title=data['title'], reused=reused)
+                    yield data
+                elif data:
+                    log(f"[{offset+i+1}/{total}] Skipped (No Title): {url}")
+                    progress.emit("skipped", index=offset + i + 1, total=total, reason="no title", url=url)
+    finally:
+        fetched.close()
+    # Only a run that emitted everything raises the mark, so an interrupted one is collected again
+    if config.incremental and seen:
+        seen.raise_high_water(mark_key(config), map(posting_id, all_links), state.get("newest_date"))
+
+def wait_for_listing(driver, config):
+    # Job links, or a settled DOM for searches without results
+    wait_for(driver, any_of(element_present(SELECTORS["job_link"]), dom_quiet(500)), 10, "search_results", config.wait_stats)
+
+def extract_all_details(driver, config, all_links):
+    """Shards detail pages over several browsers and yields (index, url, data) in listing order."""
+    log = config.log
+    tasks = queue.Queue()
+    for item in enumerate(all_links):
+        tasks.put(item)
+    done = queue.Queue()
+    stop = threading.Event()
+
+    def work(browser):
+        limiter = RateLimiter(config.detail_delay)
+        while not stop.is_set():
+            try: i, url = tasks.get_nowait()
+            except queue.Empty: return
+            data = None
             try:
-                driver.get(url)
-                time.sleep(1) # Polite delay
-                
-                # Extract ID
-                job_id_match = re.search(r"/jobs/(\d+)-", url)
-                job_id = job_id_match.group(1) if job_id_match else "unknown"
-                
-                data = {
-                    "rubyonremote_job_id": job_id,
-                    "url": url,
-                    "title": None,
-                    "company": None,
-                    "date": None,
-                    "description": None
-                }
-                
-                # Scrape Title
-                try: 
-                    data['title'] = clean_text(driver.find_element(By.CSS_SELECTOR, "h1.schema-job-title").text)
-                except: pass
-                
-                # Scrape Company
-                try: 
-                    data['company'] = clean_text(driver.find_element(By.CSS_SELECTOR, "div.rounded-lg h3").text)
-                except: pass
-                
-                # Scrape Date
-                try: 
-                    date_el = driver.find_element(By.XPATH, "//h2[contains(text(), 'Published on')]")
-                    data['date'] = clean_text(date_el.text.replace("Published on", ""))
-                except: pass
-                
-                # Scrape Description
-                try:
-                    desc_el = driver.find_element(By.CSS_SELECTOR, "div.schema-job-description")
-                    data['description'] = clean_text(desc_el.text)
-                except: pass
-
-                if data['title']:
-                    print(f"[{i+1}/{len(all_links)}] Scraped: {data['title']}")
-                    all_data.append(data)
+                # A page cached by an earlier job (either engine) is parsed without loading it
+                html = config.page_cache.get(url, "detail") if config.page_cache else None
+                if html is not None:
+                    data = parse_details(html, url)
                 else:
-                    print(f"[{i+1}/{len(all_links)}] Skipped (No Title): {url}")
+                    limiter.wait()
+                    browser.get(url)
+                    wait_for(browser, element_present(SELECTORS["detail_page"]["title"]), 5, "detail_page", config.wait_stats)
+                    data = extract_details(browser, url)
+                    config.block_stats.collect(browser)
+                    if config.page_cache and data["title"]:
+                        config.page_cache.put(url, "detail", browser.page_source)
+            except Exception as e:
+                if driver_lost(e):
+                    # The run cannot finish without this browser: hand the error to the merge, which raises it
+                    done.put((i, url, e))
+                    return
+                log(f"Error processing {url}: {e}")
+                config.progress.emit("error", message=describe_error(e), url=url)
+            done.put((i, url, data))
+
+    def extra_worker(n):
+        try:
+            with worker_driver(config) as extra, traced(extra, config.driver_trace):
+                setup_blocking(extra, config.blocklist(), log)
+                work(extra)
+        except Exception as e:
+            log(f"   Detail worker {n} failed: {e}")
+
+    n_workers = max(1, min(config.detail_workers, len(all_links)))
+    threads = [threading.Thread(target=work, args=(driver,), daemon=True)]
+    threads += [threading.Thread(target=extra_worker, args=(n,), daemon=True) for n in range(1, n_workers)]
+    for t in threads: t.start()
+
+    # Merge: hold early finishers until every earlier listing index is out
+    pending = {}
+    next_index = 0
+    try:
+        while next_index < len(all_links):
+            i, url, data = done.get()
+            if isinstance(data, Exception): raise data
+            pending[i] = (url, data)
+            while next_index in pending:
+                url, data = pending.pop(next_index)
+                yield next_index, url, data
+                next_index += 1
+    finally:
+        stop.set()
+        for t in threads: t.join()
+
+def extract_details(driver, url):
+    data = {
+        "rubyonremote_job_id": posting_id(url) or "unknown",
+        "url": url,
+    }
+    # Title, company, date and description in one round trip
+    data.update(extract_fields(driver, SELECTORS["detail_page"]))
+    return data
+
+# --- HTTP Engine ---
+# RubyOnRemote is server-rendered, so the same selectors work on the raw HTML
+BLOCK_TAGS = {"address", "article", "blockquote", "br", "dd", "div", "dl", "dt", "footer", "h1", "h2", "h3",
+              "h4", "h5", "h6", "header", "hr", "li", "ol", "p", "pre", "section", "table", "td", "th", "tr", "ul"}
+
+def http_session(pool_size):
+    """Keep-alive session whose connection pool is large enough for every worker."""
+    session = requests.Session()
+    retry = Retry(total=3, backoff_factor=0.5, status_forcelist=(429, 500, 502, 503, 504))
+    adapter = HTTPAdapter(pool_connections=1, pool_maxsize=pool_size, max_retries=retry)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    session.headers.update({"User-Agent": USER_AGENT, "Accept-Language": "en-US,en;q=0.9"})
+    return session
+
+def fetch_html(session, url, cache=None, kind="detail"):
+    if cache is not None:
+        return cache.fetch(url, kind, lambda u: fetch_html(session, u))
+    response = session.get(url, timeout=30)
+    response.raise_for_status()
+    return response.text
+
+def node_text(el):
+    """Approximates Selenium's .text: block elements break words, scripts are ignored."""
+    if el is None: return None
+    parts = []
+    for node in el.descendants:
+        if isinstance(node, NavigableString):
+            if not isinstance(node, Comment) and node.parent.name not in ("script", "style"):
+                parts.append(str(node))
+        elif node.name in BLOCK_TAGS:
+            parts.append(" ")
+    return clean_text("".join(parts))
 
+def parse_listing(html, page_url):
+    """Returns (job urls, next page url) for a search results page."""
+    soup = BeautifulSoup(html, "html.parser")
+    links = []
+    for a in soup.select(SELECTORS["job_link"]):
+        url = urljoin(page_url, a["href"])
+        if url not in links:
+            links.append(url)
+    next_btn = soup.select_one(SELECTORS["next_page"])
+    next_url = urljoin(page_url, next_btn["href"]) if next_btn and next_btn.get("href") else None
+    return links, next_url
+
+def parse_details(html, url):
+    soup = BeautifulSoup(html, "html.parser")
+    date_el = soup.find(lambda t: t.name == "h2" and "Published on" in t.get_text())
+    return {
+        "rubyonremote_job_id": posting_id(url) or "unknown",
+        "url": url,
+        "title": node_text(soup.select_one(SELECTORS["detail_page"]["title"])),
+        "company": node_text(soup.select_one(SELECTORS["detail_page"]["company"])),
+        "date": clean_text(node_text(date_el).replace("Published on", "")) if date_el else None,
+        "description": node_text(soup.select_one(SELECTORS["detail_page"]["description"])),
+    }
+
+def scrape_http(config):
+    """Browserless engine: same records as scrape(), fetched over a pooled keep-alive session."""
+    log = config.log
+    progress = config.progress
+    session = http_session(config.http_concurrency)
+    executor = ThreadPoolExecutor(max_workers=config.http_concurrency)
+    try:
+        search_url = construct_search_url(config.job_keywords, config.job_location, config.base_url or BASE_URL)
+        log(f"Scanning: {search_url}")
+        state = crawl_state(config, search_url)
+        all_links = state["all_links"]
+        mark = high_water_mark(config)
+
+        # Phase 1: Collect Links across Multiple Pages
+        if not state["links_complete"]:
+            page_url = state["page_url"]
+            for page_num in range(state["page_num"], config.max_pages + 1):
+                config.check_deadline()
+                log(f"--- Collecting Links: Page {page_num} ---")
+                progress.emit("page", page=page_num)
+                with progress.phase("list_load", page=page_num):
+                    # An incremental crawl reads the live listing: a cached page could hide the newest postings
+                    cache = config.page_cache if mark is None else None
+                    links, next_url = parse_listing(fetch_html(session, page_url, cache, "list"), page_url)
+                new_count, covered = add_links(all_links, links, mark)
+                log(f"   Found {new_count} new jobs on this page.")
+                progress.emit("found", new=new_count, total=len(all_links))
+                if reached_mark(config, new_count, covered): break
+
+                if page_num < config.max_pages:
+                    if not next_url:
+                        log("   No 'Next' button found. Reached last page.")
+                        break
+                    log(f"   Navigating to Page {page_num + 1}...")
+                    page_url = next_url
+                    state.update(page_num=page_num + 1, page_url=next_url)
+                    config.save_checkpoint()
+
+            state["links_complete"] = True
+            config.save_checkpoint()
+
+        # Phase 2: Details Extraction
+        def fetch_details(url):
+            try: return parse_details(fetch_html(session, url, config.page_cache, "detail"), url)
             except Exception as e:
-                print(f"Error processing {url}: {e}")
-                continue
-            
-        # Save
-        clean_kw = slugify(JOB_KEYWORDS)
-        clean_loc = slugify(JOB_LOCATION)
-        filename = f"rubyonremote_{clean_kw}_{clean_loc}.csv"
-        
-        if all_data:
-            with open(filename, "w", newline="", encoding="utf-8") as f:
-                writer = csv.DictWriter(f, fieldnames=all_data[0].keys())
-                writer.writeheader()
-                writer.writerows(all_data)
-            print(f"\n✅ Saved {len(all_data)} jobs to {filename}")
-        else:
-            print("\n❌ No data collected.")
+                log(f"Error processing {url}: {e}")
+                progress.emit("error", message=describe_error(e), url=url)
+                return None
+
+        def extract(links):
+            # map() keeps listing order while requests run concurrently
+            for i, (url, data) in enumerate(zip(links, executor.map(fetch_details, links))):
+                yield i, url, data
+
+        yield from emit_details(config, state, extract)
+    finally:
+        executor.shutdown(wait=True, cancel_futures=True)
+        session.close()
 
+def output_filename(config):
+    clean_kw = slugify(config.job_keywords)
+    clean_loc = slugify(config.job_location)
+    return f"rubyonremote_{clean_kw}_{clean_loc}.csv"
+
+def main():
+    config = ScrapeConfig(
+        job_keywords=JOB_KEYWORDS,
+        job_location=JOB_LOCATION,
+        max_pages=MAX_PAGES_TO_SCRAPE,
+        headless=HEADLESS,
+        engine=ENGINE,
+        detail_workers=DETAIL_WORKERS,
+        detail_delay=DETAIL_DELAY,
+        http_concurrency=HTTP_CONCURRENCY,
+        incremental=INCREMENTAL,
+        progress=ProgressReporter.from_env(),
+        seen_index=SeenIndex(),
+        page_cache=PageCache(),
+    )
+    # Each record is written as soon as it is scraped; the file appears once the run finishes
+    filename = output_filename(config)
+    sink = RecordSink(filename[:-len(".csv")], FIELDNAMES)
+    try:
+        for data in scrape(config):
+            sink.write(data)
     except Exception as e:
+        sink.abort(keep_partial=sink.count > 0)
         print(f"Fatal Error: {e}")
-    finally:
-        if driver: driver.quit()
+        return
+
+    if sink.count:
+        sink.close()
+        print(f"\n✅ Saved {sink.count} jobs to {filename}")
+    else:
+        sink.abort(keep_partial=False)
+        print("\n❌ No data collected.")
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
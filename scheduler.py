@@ -0,0 +1,110 @@
+import threading
+import time
+from collections import deque
+
+# --- Configuration ---
+LANES = ("interactive", "bulk")  # Dispatch priority, highest first
+SMALL_JOB_PAGES = 2              # Jobs up to this many pages go in the interactive lane
+STARVATION_LIMIT = 4             # After this many interactive jobs in a row, a waiting bulk job goes next
+MAX_QUEUED = 100                 # Submissions beyond this are refused
+
+class QueueFull(Exception):
+    pass
+
+def lane_for(max_pages):
+    return "interactive" if max_pages <= SMALL_JOB_PAGES else "bulk"
+
+class QueuedJob:
+    __slots__ = ("job_id", "lane", "fn", "args", "queued_at")
+
+    def __init__(self, job_id, lane, fn, args):
+        self.job_id = job_id
+        self.lane = lane
+        self.fn = fn
+        self.args = args
+        self.queued_at = time.time()
+
+# --- Scheduler ---
+class JobScheduler:
+    """Runs at most `workers` jobs at once. Waiting jobs queue FIFO within priority lanes.
+
+    on_queue_change(positions) is called with {job_id: (position, queued)} whenever the queue moves.
+    """
+    def __init__(self, workers, on_queue_change=None, max_queued=MAX_QUEUED):
+        self.workers = workers
+        self.max_queued = max_queued
+        self.on_queue_change = on_queue_change
+        self._cond = threading.Condition()
+        self._lanes = {lane: deque() for lane in LANES}
+        self._running = {}  # job_id -> QueuedJob
+        self._interactive_streak = 0
+        self._threads = []
+        self._waits = deque(maxlen=100)  # Recent queue waits, seconds
+
+    def start(self):
+        for n in range(self.workers):
+            thread = threading.Thread(target=self._work, name=f"scraper-{n}", daemon=True)
+            thread.start()
+            self._threads.append(thread)
+
+    def submit(self, job_id, lane, fn, *args):
+        """Queues fn(*args). Returns the job's 1-based queue position."""
+        with self._cond:
+            if self.queued_count() >= self.max_queued:
+                raise QueueFull(f"{self.max_queued} jobs are already waiting")
+            self._lanes[lane].append(QueuedJob(job_id, lane, fn, args))
+            self._cond.notify()
+            positions = self.positions()
+        self._report(positions)
+        return positions[job_id][0] if job_id in positions else 0
+
+    def queued_count(self):
+        with self._cond:
+            return sum(len(q) for q in self._lanes.values())
+
+    def positions(self):
+        """{job_id: (position, queued)} in the order jobs will be dispatched (ignoring future arrivals)."""
+        with self._cond:
+            order = [entry.job_id for lane in LANES for entry in self._lanes[lane]]
+            return {job_id: (i + 1, len(order)) for i, job_id in enumerate(order)}
+
+    def _next(self):
+        interactive, bulk = self._lanes["interactive"], self._lanes["bulk"]
+        if interactive and not (bulk and self._interactive_streak >= STARVATION_LIMIT):
+            self._interactive_streak += 1
+            return interactive.popleft()
+        self._interactive_streak = 0
+        return bulk.popleft()
+
+    def _work(self):
+        while True:
+            with self._cond:
+                while not any(self._lanes.values()):
+                    self._cond.wait()
+                entry = self._next()
+                self._running[entry.job_id] = entry
+                self._waits.append(time.time() - entry.queued_at)
+                positions = self.positions()
+            self._report(positions)
+            try:
+                entry.fn(*entry.args)
+            except Exception as e:
+                print(f"[SCHEDULER] Job {entry.job_id} failed: {e}")
+            finally:
+                with self._cond:
+                    self._running.pop(entry.job_id, None)
+
+    def _report(self, positions):
+        if self.on_queue_change and positions:
+            self.on_queue_change(positions)
+
+    def stats(self):
+        with self._cond:
+            waits = sorted(self._waits)
+            return {
+                'workers': self.workers,
+                'running': len(self._running),
+                'queued': {lane: len(q) for lane, q in self._lanes.items()},
+                'recent_wait_p50': round(waits[len(waits) // 2], 2) if waits else None,
+                'recent_wait_max': round(waits[-1], 2) if waits else None,
+            }
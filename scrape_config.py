@@ -0,0 +1,137 @@
+import time
+from dataclasses import dataclass, field
+from typing import Any, Callable, Optional
+
+from progress import ProgressReporter
+from readiness import WaitStats
+from resource_blocking import BLOCKED_TYPES, BLOCKED_URLS, BlockStats, blocklist, resource_types
+from seen_index import FRESH_FOR
+
+# --- Configuration ---
+PAGE_LOAD_TIMEOUT = 300  # WebDriver's defaults, restored on browsers that outlive a run with a deadline
+SCRIPT_TIMEOUT = 30
+
+# --- Scrape Configuration ---
+@dataclass
+class ScrapeConfig:
+    job_keywords: str = "Ruby on Rails"
+    job_location: str = ""
+    max_pages: int = 1
+    headless: bool = False
+    workplace_type: str = "remote"  # LinkedIn only: on-site / remote / hybrid
+    engine: str = "browser"  # RubyOnRemote only: "browser" (Chrome) or "http" (no browser)
+    base_url: Optional[str] = None  # Site root, e.g. a local fixture server; None uses the scraper's BASE_URL
+
+    # Parallel detail phase (RubyOnRemote): browsers working the URL queue, and the
+    # minimum seconds between two page loads of the same worker
+    detail_workers: int = 1
+    detail_delay: float = 1.0
+
+    # Concurrent requests of the HTTP engine
+    http_concurrency: int = 8
+
+    # DevTools port for a browser the scraper launches itself (None: any free port)
+    debugging_port: Optional[int] = None
+
+    # Pre-launched browser (e.g. leased from the server pool). The scraper never quits it.
+    driver: Any = None
+
+    # Optional factory for extra browsers: returns a context manager yielding a driver,
+    # or None when none is available. Without it, or when it yields None, the scraper launches its own.
+    lease_driver: Optional[Callable] = None
+
+    # Optional SeenIndex: postings scraped within fresh_for seconds (by any earlier run) reuse the
+    # stored record instead of opening their detail page again. fresh_for=0 always re-scrapes.
+    seen_index: Any = None
+    fresh_for: float = FRESH_FOR
+
+    # Incremental mode (needs seen_index): pagination stops at the first page holding only postings
+    # at or below the query's high-water mark, and only postings above it are emitted
+    incremental: bool = False
+
+    # Optional PageCache shared between jobs (RubyOnRemote list and detail pages)
+    page_cache: Any = None
+
+    # Receives human-readable log lines
+    log: Callable[[str], None] = print
+
+    # Receives structured progress events (see progress.py)
+    progress: ProgressReporter = field(default_factory=ProgressReporter)
+
+    # Time spent in readiness waits, per call site
+    wait_stats: WaitStats = field(default_factory=WaitStats)
+
+    # Block images, fonts, media, ads and analytics in the browser (see resource_blocking.py),
+    # counting blocked requests and bytes per resource type. block_types picks from BLOCKED_TYPES,
+    # block_urls replaces the ad and analytics patterns.
+    block_resources: bool = True
+    block_types: tuple = tuple(BLOCKED_TYPES)
+    block_urls: list = field(default_factory=lambda: list(BLOCKED_URLS))
+    block_stats: BlockStats = field(default_factory=BlockStats)
+
+    # Optional DriverTrace: records every WebDriver command of the job's browsers (see driver_trace.py)
+    driver_trace: Any = None
+
+    # Optional wall-clock deadline (time.time()) of the run. Scrapers check it between pages and postings
+    # and register their browsers with use_driver(), whose page loads and scripts then time out with it;
+    # expire() (run by a watchdog at the deadline) quits them, so even a hung WebDriver call returns
+    deadline: Optional[float] = None
+    _drivers: list = field(default_factory=list, repr=False)
+
+    # Optional Checkpoint: scrapers keep their frontier in its state so an interrupted run can resume
+    checkpoint: Any = None
+    _transient_state: dict = field(default_factory=dict, repr=False)
+
+    def checkpoint_state(self):
+        """Mutable resume state: the checkpoint's, or a throwaway dict when checkpointing is off."""
+        return self.checkpoint.state if self.checkpoint is not None else self._transient_state
+
+    def save_checkpoint(self):
+        if self.checkpoint is not None:
+            self.checkpoint.save()
+
+    def blocklist(self):
+        """URL patterns the job's browsers block (none with block_resources off)."""
+        return blocklist(self.block_types, self.block_urls) if self.block_resources else []
+
+    def check_deadline(self):
+        if self.deadline is not None and time.time() >= self.deadline:
+            raise TimeoutError("Scraper timed out.")
+
+    def use_driver(self, driver):
+        self._drivers.append(driver)
+        if self.deadline is not None:
+            remaining = max(1, self.deadline - time.time())
+            driver.set_page_load_timeout(min(remaining, PAGE_LOAD_TIMEOUT))
+            driver.set_script_timeout(min(remaining, SCRIPT_TIMEOUT))
+
+    def drop_driver(self, driver):
+        if driver in self._drivers: self._drivers.remove(driver)
+        if self.deadline is not None:
+            try:
+                driver.set_page_load_timeout(PAGE_LOAD_TIMEOUT)
+                driver.set_script_timeout(SCRIPT_TIMEOUT)
+            except Exception: pass  # Quit by expire(), or otherwise gone
+
+    def expire(self):
+        for driver in list(self._drivers):
+            try: driver.quit()
+            except Exception: pass
+
+    @classmethod
+    def from_payload(cls, data):
+        """Builds a config from an /api/scrape JSON payload."""
+        return cls(
+            job_keywords=data.get('job_keywords') or '',
+            job_location=data.get('job_location') or '',
+            max_pages=int(data.get('max_pages') or 1),
+            headless=bool(data.get('headless', False)),
+            workplace_type=data.get('workplace_type') or 'remote',
+            engine=data.get('engine') or 'browser',
+            detail_workers=max(1, int(data.get('detail_workers') or 1)),
+            block_resources=bool(data.get('block_resources', True)),
+            block_types=resource_types(data['block_types']) if data.get('block_types') is not None else tuple(BLOCKED_TYPES),
+            block_urls=[str(u) for u in data['block_urls']] if data.get('block_urls') is not None else list(BLOCKED_URLS),
+            fresh_for=float(data['fresh_hours']) * 3600 if data.get('fresh_hours') is not None else FRESH_FOR,
+            incremental=bool(data.get('incremental', False)),
+        )
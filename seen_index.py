@@ -0,0 +1,145 @@
+import hashlib
+import json
+import sqlite3
+import threading
+import time
+
+# --- Configuration ---
+SEEN_DB_PATH = "seen_postings.db"
+FRESH_FOR = 24 * 3600          # Seconds a stored record is reused instead of re-opening its detail page
+RETENTION = 90 * 24 * 3600     # Postings not seen in a listing for this long are dropped
+LOOKUP_BATCH = 500             # Ids per query (stays below SQLite's bound-parameter limit)
+MARK_IDS = 200                 # Newest posting ids kept in a query's high-water mark
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS seen (
+    platform TEXT NOT NULL,
+    posting_id TEXT NOT NULL,
+    last_seen REAL NOT NULL,
+    fetched_at REAL NOT NULL,
+    fingerprint TEXT NOT NULL,
+    record TEXT NOT NULL,
+    PRIMARY KEY (platform, posting_id)
+) WITHOUT ROWID;
+CREATE INDEX IF NOT EXISTS idx_seen_last_seen ON seen(last_seen);
+CREATE TABLE IF NOT EXISTS marks (
+    query TEXT PRIMARY KEY,
+    ids TEXT NOT NULL,
+    max_id INTEGER,
+    newest_date TEXT,
+    updated_at REAL NOT NULL
+) WITHOUT ROWID;
+"""
+
+def fingerprint(record):
+    """Content hash of a record, independent of key order."""
+    text = json.dumps(record, sort_keys=True, ensure_ascii=False)
+    return hashlib.blake2b(text.encode("utf-8"), digest_size=16).hexdigest()
+
+def query_key(platform, *terms):
+    """Identity of a search for its high-water mark: the platform and its normalized search terms."""
+    return "|".join([platform] + [" ".join(str(t or "").lower().split()) for t in terms])
+
+# --- High-Water Marks ---
+class HighWaterMark:
+    """Newest postings the earlier runs of a query saw (ids newest first, and the newest one's date).
+
+    Listings are sorted newest first, so a page holding nothing above the mark is where the previous
+    run's results begin. Both sites number postings in creation order: a numeric id not above the
+    highest one seen is covered even when it dropped out of the remembered ids.
+    """
+    def __init__(self, ids=(), max_id=None, newest_date=None, updated_at=None):
+        self.ids = list(ids)
+        self.max_id = max_id
+        self.newest_date = newest_date
+        self.updated_at = updated_at
+        self._known = set(self.ids)
+
+    def covers(self, posting_id):
+        """True if the posting is at or below the mark."""
+        if not posting_id: return False
+        if posting_id in self._known: return True
+        return self.max_id is not None and posting_id.isdigit() and int(posting_id) <= self.max_id
+
+    def advance(self, posting_ids, newest_date=None):
+        """The mark raised to include posting_ids (newest first)."""
+        ids = list(dict.fromkeys([i for i in posting_ids if i] + self.ids))[:MARK_IDS]
+        numbers = [int(i) for i in ids if i.isdigit()] + ([self.max_id] if self.max_id is not None else [])
+        return HighWaterMark(ids, max(numbers) if numbers else None, newest_date or self.newest_date, time.time())
+
+# --- Seen-Posting Index ---
+class SeenIndex:
+    """Posting ids seen across runs, with the last scraped record of each. Shared by all scrapers and threads.
+
+    last_seen is when a listing last showed the posting, fetched_at when its detail page was last scraped;
+    freshness is judged on fetched_at so stored records are refreshed at least every FRESH_FOR seconds.
+    """
+    def __init__(self, path=SEEN_DB_PATH, retention=RETENTION):
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(SCHEMA)
+        if retention:
+            self._conn.execute("DELETE FROM seen WHERE last_seen < ?", (time.time() - retention,))
+
+    def lookup(self, platform, posting_ids, fresh_for=FRESH_FOR):
+        """Returns {posting_id: record} for ids fetched within fresh_for seconds, and marks them seen now."""
+        ids = list(dict.fromkeys(i for i in posting_ids if i))
+        if not ids or fresh_for <= 0: return {}
+        now = time.time()
+        found = {}
+        with self._lock:
+            for start in range(0, len(ids), LOOKUP_BATCH):
+                chunk = ids[start:start + LOOKUP_BATCH]
+                marks = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"SELECT posting_id, record FROM seen WHERE platform = ? AND fetched_at >= ? AND posting_id IN ({marks})",
+                    [platform, now - fresh_for] + chunk,
+                ).fetchall()
+                for posting_id, record in rows:
+                    found[posting_id] = json.loads(record)
+            if found:
+                self._conn.executemany("UPDATE seen SET last_seen = ? WHERE platform = ? AND posting_id = ?",
+                                       [(now, platform, posting_id) for posting_id in found])
+        return found
+
+    def put(self, platform, posting_id, record):
+        """Stores a freshly scraped record. Returns True if its content differs from the stored one."""
+        if not posting_id: return False
+        now = time.time()
+        digest = fingerprint(record)
+        with self._lock:
+            row = self._conn.execute("SELECT fingerprint FROM seen WHERE platform = ? AND posting_id = ?",
+                                     (platform, posting_id)).fetchone()
+            self._conn.execute(
+                "INSERT OR REPLACE INTO seen (platform, posting_id, last_seen, fetched_at, fingerprint, record) "
+                "VALUES (?, ?, ?, ?, ?, ?)",
+                (platform, posting_id, now, now, digest, json.dumps(record, ensure_ascii=False)),
+            )
+        return row is not None and row[0] != digest
+
+    def high_water(self, query):
+        """The high-water mark of a query (see query_key); empty if it never completed a run."""
+        with self._lock:
+            return self._read_mark(query)
+
+    def raise_high_water(self, query, posting_ids, newest_date=None):
+        """Adds the postings a completed run emitted (newest first) to the query's mark."""
+        with self._lock:
+            mark = self._read_mark(query).advance(posting_ids, newest_date)
+            self._conn.execute(
+                "INSERT OR REPLACE INTO marks (query, ids, max_id, newest_date, updated_at) VALUES (?, ?, ?, ?, ?)",
+                (query, json.dumps(mark.ids), mark.max_id, mark.newest_date, mark.updated_at),
+            )
+        return mark
+
+    def _read_mark(self, query):
+        row = self._conn.execute("SELECT ids, max_id, newest_date, updated_at FROM marks WHERE query = ?",
+                                 (query,)).fetchone()
+        if row is None: return HighWaterMark()
+        return HighWaterMark(json.loads(row[0]), row[1], row[2], row[3])
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
@@ -1,5 +1,17 @@
 let currentJobId = null;
-let pollInterval = null;
+let pollingJobId = null;
+let historyInterval = null;
+let eventSource = null;
+let streamConnected = false;
+const jobsById = {};
+
+// Stores a job snapshot unless a newer one is already stored (concurrent publishers can deliver out of order)
+function storeJob(job) {
+    const stored = jobsById[job.job_id];
+    if (stored && stored.version > job.version) return false;
+    jobsById[job.job_id] = job;
+    return true;
+}
 
 function formatDate(isoString) {
     if (!isoString) return '';
@@ -15,6 +27,7 @@ document.getElementById('scrapeForm').addEventListener('submit', async (e) => {
 
     const payload = {
         platform: document.getElementById('platform').value,
+        engine: document.getElementById('engine').value,
         job_keywords: document.getElementById('job_keywords').value,
         job_location: document.getElementById('job_location').value,
         max_pages: parseInt(document.getElementById('max_pages').value),
@@ -28,11 +41,9 @@ document.getElementById('scrapeForm').addEventListener('submit', async (e) => {
             body: JSON.stringify(payload)
         });
         const data = await res.json();
-        
+
         if (data.job_id) {
-            currentJobId = data.job_id;
-            startPolling();
-            document.getElementById('statusPanel').style.display = 'block';
+            watchJob(data.job_id);
         }
     } catch (err) {
         alert("Failed to start: " + err);
@@ -41,57 +52,126 @@ document.getElementById('scrapeForm').addEventListener('submit', async (e) => {
     }
 });
 
-// 2. Poll Status
+function watchJob(jobId) {
+    currentJobId = jobId;
+    document.getElementById('statusPanel').style.display = 'block';
+    document.getElementById('downloadArea').style.display = 'none';
+    if (jobsById[jobId]) renderStatus(jobsById[jobId]);
+    if (!streamConnected) startPolling();
+}
+
+// 2. Live Updates: Server-Sent Events, with polling only while the stream is down
+function connectEvents() {
+    if (!window.EventSource) {
+        startHistoryPolling();
+        return;
+    }
+    eventSource = new EventSource('/api/events');
+
+    eventSource.onopen = () => {
+        streamConnected = true;
+        stopPolling();
+        loadHistory(); // Resync anything missed while disconnected
+    };
+
+    eventSource.addEventListener('job', (e) => {
+        const job = JSON.parse(e.data);
+        if (!storeJob(job)) return;
+        if (job.job_id === currentJobId) renderStatus(job);
+        renderHistory();
+    });
+
+    eventSource.onerror = () => {
+        // EventSource reconnects on its own; poll until it does
+        streamConnected = false;
+        if (currentJobId) startPolling();
+        startHistoryPolling();
+    };
+}
+
 function startPolling() {
-    if (pollInterval) clearInterval(pollInterval);
-    pollInterval = setInterval(checkStatus, 1000); // Poll every second
+    if (pollingJobId === currentJobId) return;
+    pollingJobId = currentJobId;
+    pollStatus(currentJobId);
 }
 
-async function checkStatus() {
-    if (!currentJobId) return;
-    
-    try {
-        const res = await fetch(`/api/status/${currentJobId}`);
-        const status = await res.json();
-        
-        // Update UI
-        document.getElementById('statusText').innerText = status.progress;
-        const badge = document.getElementById('statusBadge');
-        const fill = document.getElementById('progressFill');
-        
-        badge.className = `status-badge ${status.status}`;
-        badge.innerText = status.status;
-
-        // Visual progress bar
-        if (status.status === 'running') {
-            if (status.jobs_processed > 0) {
-                // Rough estimate based on max pages
-                const totalEst = 25 * (parseInt(document.getElementById('max_pages').value) || 1);
-                const pct = Math.min((status.jobs_processed / totalEst) * 100, 95);
-                fill.style.width = pct + "%";
-            } else {
-                fill.style.width = "10%"; // Indeterminate
-            }
+function startHistoryPolling() {
+    if (!historyInterval) historyInterval = setInterval(loadHistory, 5000);
+}
+
+function stopPolling() {
+    if (historyInterval) clearInterval(historyInterval);
+    pollingJobId = null;
+    historyInterval = null;
+}
+
+// Long-poll: the server answers as soon as the job has a version newer than ours
+async function pollStatus(jobId) {
+    while (pollingJobId === jobId) {
+        const since = jobsById[jobId] ? jobsById[jobId].version : 0;
+        try {
+            const res = await fetch(`/api/status/${jobId}?since=${since}&wait=25`);
+            const job = await res.json();
+            if (pollingJobId !== jobId) return;
+            if (!job.job_id) { pollingJobId = null; return; }
+            if (storeJob(job)) renderStatus(job);
+        } catch (e) {
+            console.error("Polling Error:", e);
+            await new Promise(resolve => setTimeout(resolve, 2000));
+        }
+    }
+}
+
+function renderStatus(status) {
+    let text = status.progress;
+    if (status.platforms) {
+        // Multi-platform job: one line per platform
+        text += '\n' + Object.entries(status.platforms).map(([name, p]) =>
+            `${name}: ${p.status === 'running' ? (p.phase || 'starting') : p.status}, ${p.records} of ${p.jobs_found || '?'}`
+        ).join(' · ');
+    }
+    document.getElementById('statusText').innerText = text;
+    const badge = document.getElementById('statusBadge');
+    const fill = document.getElementById('progressFill');
+
+    badge.className = `status-badge ${status.status}`;
+    badge.innerText = status.status;
+
+    // Visual progress bar
+    if (status.status === 'queued') {
+        fill.style.backgroundColor = "";
+        fill.classList.remove('pulse');
+        fill.style.width = "0%";
+    }
+
+    if (status.status === 'running') {
+        fill.style.backgroundColor = "";
+        fill.classList.add('pulse');
+        if (status.jobs_processed > 0) {
+            // Rough estimate based on max pages
+            const totalEst = status.jobs_found || 25 * (parseInt(document.getElementById('max_pages').value) || 1);
+            const pct = Math.min((status.jobs_processed / totalEst) * 100, 95);
+            fill.style.width = pct + "%";
+        } else {
+            fill.style.width = "10%"; // Indeterminate
         }
+    }
+
+    if (status.status === 'completed' || status.status === 'error' || status.status === 'interrupted') {
+        pollingJobId = null;
+        document.getElementById('startBtn').disabled = false;
+        document.getElementById('startBtn').innerText = "Start Scraping";
+        fill.classList.remove('pulse');
 
-        if (status.status === 'completed' || status.status === 'error') {
-            clearInterval(pollInterval);
-            document.getElementById('startBtn').disabled = false;
-            document.getElementById('startBtn').innerText = "Start Scraping";
-            fill.classList.remove('pulse');
-            
-            if (status.status === 'completed') {
-                fill.style.width = "100%";
-                document.getElementById('downloadArea').style.display = 'block';
-                document.getElementById('downloadBtn').onclick = () => window.location.href = `/api/download/${currentJobId}`;
-            } else {
-                fill.style.backgroundColor = "var(--error)";
-            }
-            
-            loadHistory(); // Refresh history
+        if (status.status === 'completed') {
+            fill.style.width = "100%";
+            document.getElementById('downloadArea').style.display = 'block';
+            document.getElementById('downloadBtn').onclick = () => window.location.href = `/api/download/${currentJobId}`;
+        } else {
+            fill.style.backgroundColor = "var(--error)";
         }
-    } catch (e) {
-        console.error("Polling Error:", e);
+
+        if (!streamConnected) loadHistory(); // Refresh history
     }
 }
 
@@ -100,33 +180,59 @@ async function loadHistory() {
     try {
         const res = await fetch('/api/jobs');
         const data = await res.json();
-        const container = document.getElementById('jobHistory');
-        
-        if (!data.jobs || data.jobs.length === 0) {
-            container.innerHTML = "<p style='color: #94a3b8; text-align: center;'>No jobs run yet.</p>";
-            return;
+        const listed = new Set((data.jobs || []).map(job => job.job_id));
+        for (const key of Object.keys(jobsById)) {
+            if (!listed.has(jobsById[key].job_id)) delete jobsById[key];
         }
+        (data.jobs || []).forEach(storeJob);
+        renderHistory();
+    } catch (e) {
+        console.error("History Error:", e);
+    }
+}
 
-        container.innerHTML = data.jobs.map(job => `
-            <div class="job-item">
-                <div class="job-info">
-                    <h4>${job.platform} - ${job.job_keywords}</h4>
-                    <div class="meta">
-                        ${formatDate(job.started_at)} • 
-                        ${job.results_count !== undefined ? job.results_count + ' items' : job.status}
-                    </div>
-                </div>
-                <div>
-                    <span class="status-badge ${job.status}">${job.status}</span>
-                    ${job.status === 'completed' ? `<a href="/api/download/${job.job_id}" class="btn btn-success" style="text-decoration:none; margin-left:8px;">⬇</a>` : ''}
+function renderHistory() {
+    const container = document.getElementById('jobHistory');
+    const jobs = Object.values(jobsById).sort((a, b) => b.job_id - a.job_id);
+
+    if (jobs.length === 0) {
+        container.innerHTML = "<p style='color: #94a3b8; text-align: center;'>No jobs run yet.</p>";
+        return;
+    }
+
+    container.innerHTML = jobs.map(job => `
+        <div class="job-item">
+            <div class="job-info">
+                <h4>${job.platform} - ${job.job_keywords}</h4>
+                <div class="meta">
+                    ${formatDate(job.started_at)} •
+                    ${job.status === 'queued' ? 'queue position ' + job.queue_position : job.results_count !== undefined ? job.results_count + ' items' : job.status}
                 </div>
             </div>
-        `).join('');
-    } catch (e) {
-        console.error("History Error:", e);
+            <div>
+                <span class="status-badge ${job.status}">${job.status}</span>
+                ${job.status === 'completed' && job.output_file ? `<a href="/api/download/${job.job_id}" class="btn btn-success" style="text-decoration:none; margin-left:8px;">⬇</a>` : ''}
+                ${job.resumable && job.status !== 'running' && job.status !== 'queued' ? `<button class="btn" style="width:auto; margin-left:8px;" title="Resume from last checkpoint" onclick="resumeJob(${job.job_id})">↻</button>` : ''}
+            </div>
+        </div>
+    `).join('');
+}
+
+// 4. Resume an interrupted job from its checkpoint
+async function resumeJob(jobId) {
+    try {
+        const res = await fetch(`/api/resume/${jobId}`, {method: 'POST'});
+        const data = await res.json();
+        if (!res.ok) {
+            alert("Failed to resume: " + data.error);
+            return;
+        }
+        watchJob(jobId);
+        if (!streamConnected) loadHistory();
+    } catch (err) {
+        alert("Failed to resume: " + err);
     }
 }
 
-// Auto-refresh history every 5 seconds
-setInterval(loadHistory, 5000);
-loadHistory();
\ No newline at end of file
+loadHistory();
+connectEvents();